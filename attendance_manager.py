@@ -1,7 +1,6 @@
 import csv
 import sqlite3
-import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
 import os
 
 class AttendanceManager:
@@ -44,11 +43,13 @@ class AttendanceManager:
         conn.commit()
         conn.close()
     
-    def mark_attendance(self, student_id, name, mode="Face Recognition"):
-        """Mark attendance for a student"""
-        now = datetime.now()
+    def mark_attendance(self, student_id, name, mode="Face Recognition", timestamp=None):
+        """Mark attendance for a student, at the given datetime or now"""
+        now = timestamp or datetime.now()
         date_str = now.strftime("%Y-%m-%d")
         time_str = now.strftime("%H:%M:%S")
+        # Same UTC format as the column default, so old and new rows sort together
+        timestamp_str = now.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
         
         # Check if already marked today
         if self.is_already_marked_today(student_id, date_str):
@@ -63,9 +64,9 @@ class AttendanceManager:
         conn = sqlite3.connect(self.db_file)
         cursor = conn.cursor()
         cursor.execute('''
-            INSERT INTO attendance (student_id, name, date, time, mode)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (student_id, name, date_str, time_str, mode))
+            INSERT INTO attendance (student_id, name, date, time, mode, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (student_id, name, date_str, time_str, mode, timestamp_str))
         conn.commit()
         conn.close()
         
@@ -85,6 +86,9 @@ class AttendanceManager:
     
     def get_attendance_records(self, date_filter=None):
         """Get attendance records with optional date filter"""
+        # pandas is only needed for reports, so modes that mark attendance start without it
+        import pandas as pd
+        
         conn = sqlite3.connect(self.db_file)
         
         if date_filter:
@@ -99,6 +103,8 @@ class AttendanceManager:
     
     def get_student_attendance_summary(self):
         """Get attendance summary by student"""
+        import pandas as pd
+        
         conn = sqlite3.connect(self.db_file)
         query = '''
             SELECT student_id, name, COUNT(*) as total_days,
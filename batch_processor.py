@@ -0,0 +1,167 @@
+"""Headless attendance from recorded lecture videos
+
+    python batch_processor.py lecture1.mp4 lecture2.mp4 --sample-fps 1 --workers 8
+
+Each video is split into segments that are recognized in parallel worker
+processes. Attendance is written through AttendanceManager with the time
+the student appeared in the recording, not the time of processing.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import cv2
+from attendance_manager import AttendanceManager
+from camera_config import get_camera_config
+from face_recognition_module import FaceRecognitionModule
+from student_registration import StudentRegistration
+
+# Recognition module of this worker process, created once by init_worker
+worker_module = None
+
+
+def init_worker(detector, detection_scale):
+    global worker_module
+    # One OpenCV thread per process; parallelism comes from the process pool
+    cv2.setNumThreads(1)
+    # The course comes with each segment, not from today's timetable
+    worker_module = FaceRecognitionModule(detection_scale=detection_scale, detector=detector,
+                                          follow_timetable=False)
+
+
+def video_info(path):
+    """Return (fps, frame_count) of a video file"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return fps, frame_count
+
+
+def video_start_time(path, fps, frame_count, start_time=None):
+    """Wall-clock time of the first frame
+
+    Uses start_time when given, otherwise assumes the recording finished when
+    the file was last modified.
+    """
+    if start_time:
+        return start_time
+    modified = datetime.fromtimestamp(os.path.getmtime(path))
+    return modified - timedelta(seconds=frame_count / fps)
+
+
+def process_segment(path, start_frame, end_frame, step, fps, course_id=None):
+    """Worker task: recognize sampled frames of one segment
+
+    Faces are matched against course_id's roster first when given.
+
+    Returns {student_id: (name, offset_seconds, confidence)} with the first
+    confident sighting of each student.
+    """
+    if course_id != worker_module.course_id:
+        worker_module.course_id = course_id
+        worker_module.update_roster(force=True)
+
+    # Cached results from the previous segment belong to another video
+    if worker_module.encoding_cache is not None:
+        worker_module.encoding_cache.clear()
+
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    sightings = {}
+
+    # Recordings use the zones configured under their file name
+    camera = get_camera_config(os.path.basename(path))
+
+    for frame_index in range(start_frame, end_frame):
+        # grab() skips decoding work for frames that are not sampled
+        if frame_index % step:
+            if not cap.grab():
+                break
+            continue
+
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        for face in worker_module.recognize_faces(frame, camera=camera):
+            student_id = face['student_id']
+            if student_id and face['confidence'] > 0.5 and student_id not in sightings:
+                sightings[student_id] = (face['name'], frame_index / fps, face['confidence'])
+
+    cap.release()
+    return sightings
+
+
+def process_videos(paths, sample_fps=1.0, workers=None, start_time=None, segment_seconds=120,
+                   detector='hog', detection_scale=0.5, dry_run=False, course_id=None):
+    """Recognize students in the videos and mark their attendance
+
+    Without course_id, each video is matched against the roster of the
+    course the timetable has in session when the recording started.
+
+    Returns {path: {student_id: (name, datetime)}} with the first sighting per video.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    starts = {}
+    registration = StudentRegistration()
+
+    for path in paths:
+        fps, frame_count = video_info(path)
+        starts[path] = video_start_time(path, fps, frame_count, start_time)
+        step = max(1, int(round(fps / sample_fps)))
+        segment_frames = max(step, int(segment_seconds * fps))
+        course = course_id or registration.get_active_course(starts[path])
+
+        for start_frame in range(0, frame_count, segment_frames):
+            tasks.append((path, start_frame, min(frame_count, start_frame + segment_frames), step, fps, course))
+
+    print(f"Processing {len(paths)} videos as {len(tasks)} segments on {workers} workers")
+
+    first_seen = {path: {} for path in paths}
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(detector, detection_scale)) as executor:
+        futures = {executor.submit(process_segment, *task): task for task in tasks}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future][0]
+            for student_id, (name, offset, _) in future.result().items():
+                seen_at = starts[path] + timedelta(seconds=offset)
+                if student_id not in first_seen[path] or seen_at < first_seen[path][student_id][1]:
+                    first_seen[path][student_id] = (name, seen_at)
+            print(f"  {done}/{len(tasks)} segments done")
+
+    if not dry_run:
+        attendance_mgr = AttendanceManager()
+        for path, students in first_seen.items():
+            for student_id, (name, seen_at) in sorted(students.items(), key=lambda item: item[1][1]):
+                success, message = attendance_mgr.mark_attendance(student_id, name, "Video", timestamp=seen_at)
+                print(f"{'✓' if success else '⚠'} [{os.path.basename(path)}] {message}")
+
+    return first_seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('videos', nargs='+', help="Video files to process")
+    parser.add_argument('--sample-fps', type=float, default=1.0, help="Frames per second of video to recognize")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--start-time', type=datetime.fromisoformat, default=None,
+                        help="Recording start, e.g. 2026-10-17T09:00 (default: file mtime minus duration)")
+    parser.add_argument('--segment-seconds', type=float, default=120, help="Length of video per worker task")
+    parser.add_argument('--detector', default='hog', help="Face detector backend")
+    parser.add_argument('--detection-scale', type=float, default=0.5)
+    parser.add_argument('--course', default=None, help="Course whose roster is matched first (default: timetable)")
+    parser.add_argument('--dry-run', action='store_true', help="Report sightings without marking attendance")
+    args = parser.parse_args()
+
+    results = process_videos(args.videos, args.sample_fps, args.workers, args.start_time, args.segment_seconds,
+                             args.detector, args.detection_scale, args.dry_run, args.course)
+
+    for path, students in results.items():
+        print(f"{path}: {len(students)} students recognized")
+
+
+if __name__ == "__main__":
+    main()
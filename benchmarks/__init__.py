@@ -0,0 +1,4 @@
+"""Offline performance benchmarks. Run from the repository root, e.g.
+
+    python -m benchmarks.face_index
+"""
@@ -0,0 +1,103 @@
+"""Mode-switch time and per-frame capture cost: direct cv2.VideoCapture vs CameraService
+
+Needs a real camera (or a video file / stream URL as the source):
+
+    python -m benchmarks.camera --source 0 --switches 5 --frames 150
+
+"Switch" is the time from opening the camera to holding the first frame, as
+a mode pays it when it starts. Per-frame cost is what the consumer spends
+getting a mirrored BGR frame plus its RGB conversion; frame age is how old
+that frame already was when the service handed it over.
+"""
+import argparse
+import json
+import time
+import cv2
+from frame_capture import CameraService, convert_color
+from benchmarks.common import percentiles
+
+
+def direct_switch(source):
+    start = time.perf_counter()
+    cap = cv2.VideoCapture(source)
+    cap.read()
+    elapsed = time.perf_counter() - start
+    cap.release()
+    return elapsed
+
+
+def service_switch(service, source):
+    start = time.perf_counter()
+    capture = service.acquire(source)
+    capture.read(0, timeout=5.0)
+    elapsed = time.perf_counter() - start
+    service.release(capture)
+    return elapsed
+
+
+def direct_frames(source, frames):
+    cap = cv2.VideoCapture(source)
+    costs = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = cv2.flip(frame, 1)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        costs.append(time.perf_counter() - start)
+    cap.release()
+    return costs
+
+
+def service_frames(service, source, frames):
+    capture = service.acquire(source, flip=True)
+    costs, ages = [], []
+    frame_id, frame, rgb_frame = 0, None, None
+    for _ in range(frames):
+        start = time.perf_counter()
+        frame_id, new_frame, captured_at = capture.read(frame_id, out=frame)
+        if new_frame is None:
+            break
+        frame = new_frame
+        rgb_frame = convert_color(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+        costs.append(time.perf_counter() - start)
+        ages.append(time.monotonic() - captured_at)
+    service.release(capture)
+    return costs, ages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default='0', help="Device index, stream URL or video file")
+    parser.add_argument('--switches', type=int, default=5, help="Mode switches to time")
+    parser.add_argument('--frames', type=int, default=150, help="Frames to read per method")
+    parser.add_argument('--json', help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    service = CameraService(linger=30.0)
+
+    direct_costs = direct_frames(source, args.frames)
+    service_costs, ages = service_frames(service, source, args.frames)
+    results = {
+        'switch_direct': percentiles([direct_switch(source) for _ in range(args.switches)]),
+        'switch_service': percentiles([service_switch(service, source) for _ in range(args.switches)]),
+        'frame_direct': percentiles(direct_costs),
+        'frame_service': percentiles(service_costs),
+        'frame_age_service': percentiles(ages),
+    }
+    service.close_all()
+
+    print(f"{'measurement':>18} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, stats in results.items():
+        if stats['p50'] is not None:
+            print(f"{name:>18} {stats['p50']:>9.2f} {stats['p95']:>9.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import time
+import numpy as np
+
+
+def synthetic_gallery(size, dim=128, seed=0):
+    """Random encodings with roughly the spread of real face_recognition encodings"""
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, 0.09, (size, dim)).astype(np.float32)
+
+
+def synthetic_probes(gallery, count, noise=0.03, seed=1):
+    """Noisy copies of random gallery entries, returned with their true row indices"""
+    rng = np.random.default_rng(seed)
+    truth = rng.integers(0, len(gallery), count)
+    probes = gallery[truth] + rng.normal(0, noise, (count, gallery.shape[1])).astype(np.float32)
+    return probes, truth
+
+
+def time_calls(func, inputs):
+    """Call func once per input and return per-call latencies in seconds"""
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies)
+
+
+def percentiles(latencies, points=(50, 95, 99)):
+    """Latency percentiles in milliseconds"""
+    if len(latencies) == 0:
+        return {f"p{p}": None for p in points}
+    return {f"p{p}": float(np.percentile(latencies, p) * 1000) for p in points}
+
+
+def measure_stage(func, inputs, warmup=3, memory_samples=20):
+    """Throughput, latency percentiles and peak Python memory of one stage
+
+    Timing and memory are measured in separate passes so tracemalloc's
+    overhead does not distort the latencies.
+    """
+    import tracemalloc
+
+    inputs = list(inputs)
+    for item in inputs[:warmup]:
+        func(item)
+
+    latencies = time_calls(func, inputs)
+
+    tracemalloc.start()
+    for item in inputs[:memory_samples]:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'calls': len(inputs),
+        'throughput': float(len(inputs) / latencies.sum()) if latencies.sum() > 0 else None,
+        'mean_ms': float(latencies.mean() * 1000) if len(latencies) else None,
+        **percentiles(latencies, (50, 95, 99)),
+        'peak_memory_mb': peak / (1024 * 1024),
+    }
@@ -0,0 +1,125 @@
+"""Throughput and detection recall of the face detector backends on a fixture set
+
+The fixture directory holds images plus an optional annotations.json mapping
+each image file name to its ground-truth boxes as [top, right, bottom, left]:
+
+    {"room_a_001.jpg": [[120, 340, 210, 250], ...], ...}
+
+    python -m benchmarks.detectors fixtures/faces --detectors haar hog yunet ssd --scales 1.0 0.5
+"""
+import argparse
+import json
+import os
+import cv2
+from face_detectors import DETECTORS, create_detector
+from face_geometry import location_iou, scale_location
+from benchmarks.common import time_calls, percentiles
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_fixtures(fixture_dir):
+    """Return a list of (name, rgb_image, ground_truth_boxes or None)"""
+    annotations_path = os.path.join(fixture_dir, 'annotations.json')
+    annotations = None
+    if os.path.exists(annotations_path):
+        with open(annotations_path, 'r') as f:
+            annotations = json.load(f)
+
+    fixtures = []
+    for name in sorted(os.listdir(fixture_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image = cv2.imread(os.path.join(fixture_dir, name))
+        if image is None:
+            continue
+        truth = [tuple(box) for box in annotations.get(name, [])] if annotations is not None else None
+        fixtures.append((name, cv2.cvtColor(image, cv2.COLOR_BGR2RGB), truth))
+    return fixtures
+
+
+def match_counts(detected, truth, iou_threshold=0.5):
+    """Number of ground-truth boxes found, greedily matched by IoU"""
+    found = 0
+    unused = list(detected)
+    for box in truth:
+        best = max(unused, key=lambda d: location_iou(d, box), default=None)
+        if best is not None and location_iou(best, box) >= iou_threshold:
+            unused.remove(best)
+            found += 1
+    return found
+
+
+def run(fixtures, detector_names, scales, iou_threshold):
+    results = []
+
+    for name in detector_names:
+        try:
+            detector = create_detector(name)
+        except (FileNotFoundError, cv2.error) as e:
+            print(f"⚠ Skipping {name}: {e}")
+            continue
+
+        for scale in scales:
+            def detect(rgb_image):
+                small = rgb_image if scale == 1 else cv2.resize(
+                    rgb_image, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+                )
+                return [scale_location(loc, scale, rgb_image.shape) for loc in detector.detect(small)]
+
+            # One untimed pass for warm-up and accuracy
+            detections = [detect(image) for _, image, _ in fixtures]
+            latencies = time_calls(detect, [image for _, image, _ in fixtures])
+
+            row = {
+                'detector': name, 'scale': scale,
+                'fps': float(len(latencies) / latencies.sum()) if len(latencies) else 0.0,
+                'detections': sum(len(d) for d in detections),
+                'recall': None, 'precision': None,
+                **percentiles(latencies)
+            }
+
+            annotated = [(d, truth) for d, (_, _, truth) in zip(detections, fixtures) if truth is not None]
+            if annotated:
+                total_truth = sum(len(truth) for _, truth in annotated)
+                total_detected = sum(len(d) for d, _ in annotated)
+                found = sum(match_counts(d, truth, iou_threshold) for d, truth in annotated)
+                row['recall'] = found / total_truth if total_truth else None
+                row['precision'] = found / total_detected if total_detected else None
+
+            results.append(row)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('fixture_dir')
+    parser.add_argument('--detectors', nargs='+', default=list(DETECTORS))
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0, 0.5])
+    parser.add_argument('--iou', type=float, default=0.5, help="IoU needed to count a detection as a hit")
+    parser.add_argument('--json', help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixture_dir)
+    if not fixtures:
+        parser.error(f"No images found in {args.fixture_dir}")
+
+    results = run(fixtures, args.detectors, args.scales, args.iou)
+
+    def fmt(value):
+        return f"{value:.3f}" if value is not None else "-"
+
+    print(f"{len(fixtures)} fixture images")
+    print(f"{'detector':>9} {'scale':>6} {'fps':>8} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7} {'prec':>7}")
+    for row in results:
+        print(f"{row['detector']:>9} {row['scale']:>6.2f} {row['fps']:>8.1f} {row['p50']:>8.2f} "
+              f"{row['p95']:>8.2f} {fmt(row['recall']):>7} {fmt(row['precision']):>7}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Recall, per-query latency and memory of the gallery indexes on synthetic encodings
+
+    python -m benchmarks.face_index --sizes 1000 10000 100000 --probes 1 4 8 16
+
+Memory counts every array FaceRecognitionModule holds for the gallery: the
+gallery as read from disk plus the index, with shared arrays counted once.
+"int8 store" is an int8 index over a gallery enrolled as int8, so it holds
+only the codes. The "orig MB" column is what the original float64 dict plus
+its float32 exact index took for the same gallery.
+"""
+import argparse
+import time
+import numpy as np
+from face_index import ExactIndex, IVFIndex, QuantizedIndex, quantize_int8
+from benchmarks.common import synthetic_gallery, synthetic_probes, time_calls, percentiles
+
+
+INDEX_ARRAYS = ('matrix', 'sq_norms', 'centroids', 'centroid_sq_norms', 'row_ids', 'offsets',
+                'codes', 'scales', 'code_sq_norms', 'exact_vectors')
+
+
+def module_bytes(gallery, index):
+    """Bytes of every distinct array held for a gallery (matrix or (codes, scales)) and its index"""
+    arrays = list(gallery) if isinstance(gallery, tuple) else [gallery]
+    arrays += [getattr(index, name) for name in INDEX_ARRAYS if isinstance(getattr(index, name, None), np.ndarray)]
+
+    seen = {}
+    for array in arrays:
+        seen[(array.__array_interface__['data'][0], array.nbytes)] = array.nbytes
+    return sum(seen.values())
+
+
+def run(sizes, probes, queries, rerank=16):
+    results = []
+
+    for size in sizes:
+        gallery = synthetic_gallery(size)
+        probe_vectors, truth = synthetic_probes(gallery, queries)
+
+        start = time.perf_counter()
+        exact = ExactIndex(gallery)
+        exact_build = time.perf_counter() - start
+        original_mb = (gallery.size * 8 + module_bytes(gallery, exact)) / 2 ** 20
+
+        start = time.perf_counter()
+        ivf = IVFIndex(gallery)
+        ivf_build = time.perf_counter() - start
+
+        # Recall is measured against exact search, not the synthetic ground truth
+        exact_distances, exact_indices = exact.search(probe_vectors)
+        latencies = time_calls(lambda q: exact.search(q[None]), probe_vectors)
+        results.append({
+            'size': size, 'index': 'exact', 'n_probe': None, 'build_s': exact_build,
+            'recall': 1.0, 'identity_recall': float(np.mean(exact_indices[:, 0] == truth)),
+            'memory_mb': module_bytes(gallery, exact) / 2 ** 20, 'original_mb': original_mb,
+            **percentiles(latencies)
+        })
+
+        start = time.perf_counter()
+        codes, scales = quantize_int8(gallery)
+        quantized = QuantizedIndex(codes, scales, exact_vectors=gallery, rerank=rerank)
+        quantized_build = time.perf_counter() - start
+
+        distances, indices = quantized.search(probe_vectors)
+        latencies = time_calls(lambda q: quantized.search(q[None]), probe_vectors)
+        results.append({
+            'size': size, 'index': f'int8(r{rerank})', 'n_probe': None, 'build_s': quantized_build,
+            'recall': float(np.mean(indices[:, 0] == exact_indices[:, 0])),
+            'identity_recall': float(np.mean(indices[:, 0] == truth)),
+            'memory_mb': module_bytes(gallery, quantized) / 2 ** 20, 'original_mb': original_mb,
+            'max_distance_error': float(np.max(np.abs(distances[:, 0] - exact_distances[:, 0]))),
+            **percentiles(latencies)
+        })
+
+        # Enrolled as int8: the codes are the gallery, no float vectors are held
+        int8_store = QuantizedIndex(codes, scales)
+        distances, indices = int8_store.search(probe_vectors)
+        latencies = time_calls(lambda q: int8_store.search(q[None]), probe_vectors)
+        results.append({
+            'size': size, 'index': 'int8 store', 'n_probe': None, 'build_s': quantized_build,
+            'recall': float(np.mean(indices[:, 0] == exact_indices[:, 0])),
+            'identity_recall': float(np.mean(indices[:, 0] == truth)),
+            'memory_mb': module_bytes((codes, scales), int8_store) / 2 ** 20, 'original_mb': original_mb,
+            'max_distance_error': float(np.max(np.abs(distances[:, 0] - exact_distances[:, 0]))),
+            **percentiles(latencies)
+        })
+
+        for n_probe in probes:
+            _, indices = ivf.search(probe_vectors, n_probe=n_probe)
+            latencies = time_calls(lambda q: ivf.search(q[None], n_probe=n_probe), probe_vectors)
+            results.append({
+                'size': size, 'index': f'ivf({ivf.n_lists})', 'n_probe': n_probe, 'build_s': ivf_build,
+                'recall': float(np.mean(indices[:, 0] == exact_indices[:, 0])),
+                'identity_recall': float(np.mean(indices[:, 0] == truth)),
+                'memory_mb': module_bytes(gallery, ivf) / 2 ** 20, 'original_mb': original_mb,
+                **percentiles(latencies)
+            })
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--probes', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--rerank', type=int, default=16, help="Candidates re-ranked by the int8 index")
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'index':>12} {'n_probe':>8} {'build s':>8} {'recall':>7} "
+          f"{'id rec':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'MB':>8} {'orig MB':>8}")
+    for row in run(args.sizes, args.probes, args.queries, args.rerank):
+        print(f"{row['size']:>8} {row['index']:>12} {str(row['n_probe'] or '-'):>8} {row['build_s']:>8.2f} "
+              f"{row['recall']:>7.3f} {row['identity_recall']:>7.3f} {row['p50']:>8.3f} "
+              f"{row['p95']:>8.3f} {row['p99']:>8.3f} {row['memory_mb']:>8.1f} {row['original_mb']:>8.1f}")
+        if 'max_distance_error' in row:
+            print(f"{'':>8} {'':>12} max top-1 distance error vs float: {row['max_distance_error']:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Per-frame cost of gesture detection at different inference settings
+
+Runs each configuration over the same recorded video (or camera) and
+compares its raised-hand decisions with full-resolution inference on every
+frame:
+
+    python -m benchmarks.gesture --source class.mp4 --frames 300
+
+"agreement" is the share of frames whose number of raised hands matches the
+baseline; frames where the estimator only predicted landmarks are included.
+"""
+import argparse
+import json
+import cv2
+from gesture_detection import GestureDetection
+from benchmarks.common import percentiles, time_calls
+
+CONFIGS = {
+    'baseline': {},
+    'width_320': {'inference_width': 320},
+    'stride_3': {'inference_stride': 3},
+    'roi': {'roi_tracking': True},
+    'width_320_stride_3_roi': {'inference_width': 320, 'inference_stride': 3, 'roi_tracking': True},
+}
+
+
+def load_frames(source, count):
+    cap = cv2.VideoCapture(source)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.flip(frame, 1))
+    cap.release()
+    return frames
+
+
+def run_config(settings, frames):
+    gesture_module = GestureDetection(**settings)
+    raised_counts = []
+
+    def detect(frame):
+        _, raised = gesture_module.detect_hands(frame)
+        raised_counts.append(int(raised.sum()))
+
+    latencies = time_calls(detect, frames)
+    return latencies, raised_counts, gesture_module.estimator.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default='0', help="Device index, stream URL or video file")
+    parser.add_argument('--frames', type=int, default=300, help="Frames to process per configuration")
+    parser.add_argument('--json', help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    frames = load_frames(source, args.frames)
+    if not frames:
+        print("⚠ No frames could be read from the source")
+        return
+
+    results = {}
+    baseline_counts = None
+    for name, settings in CONFIGS.items():
+        latencies, raised_counts, summary = run_config(settings, frames)
+        if baseline_counts is None:
+            baseline_counts = raised_counts
+        agreement = sum(a == b for a, b in zip(raised_counts, baseline_counts)) / len(frames)
+        results[name] = {**percentiles(latencies), 'agreement': agreement, 'inference': summary}
+
+    print(f"{'config':>24} {'p50 ms':>9} {'p95 ms':>9} {'agreement':>10}")
+    for name, row in results.items():
+        print(f"{name:>24} {row['p50']:>9.2f} {row['p95']:>9.2f} {row['agreement']:>10.1%}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
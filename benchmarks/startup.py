@@ -0,0 +1,93 @@
+"""Application startup time and first-frame latency with and without warm-up
+
+Every measurement runs in a fresh interpreter, so imports and model loading
+are paid as they are when the app starts:
+
+    python -m benchmarks.startup --runs 3
+
+"menu" is the time from starting main.py's imports to the menu window having
+been drawn (needs a display; skipped without one). "first frame" is the
+latency of a module's first frame right after it was built, cold or after
+warm_up().
+"""
+import argparse
+import json
+import subprocess
+import sys
+import numpy as np
+
+MENU = '''
+import time
+started = time.perf_counter()
+import tkinter as tk
+import main
+root = tk.Tk()
+app = main.SmartAttendanceSystem(root)
+root.update()
+print(time.perf_counter() - started)
+root.destroy()
+'''
+
+FIRST_FRAME = '''
+import time
+import numpy as np
+from {module} import {cls}
+instance = {cls}()
+if {warm}:
+    instance.warm_up()
+frame = np.zeros((480, 640, 3), dtype=np.uint8)
+started = time.perf_counter()
+instance.{method}(frame)
+print(time.perf_counter() - started)
+'''
+
+FIRST_FRAME_TARGETS = {
+    'gesture': ('gesture_detection', 'GestureDetection', 'detect_hands'),
+    'face': ('face_recognition_module', 'FaceRecognitionModule', 'recognize_faces'),
+}
+
+
+def measure(code, runs):
+    """Seconds printed by code on its last line, once per fresh interpreter"""
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help="Fresh interpreters per measurement")
+    parser.add_argument('--json', help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    cases = {'menu': MENU}
+    for name, (module, cls, method) in FIRST_FRAME_TARGETS.items():
+        for warm in (False, True):
+            label = f"{name}_first_frame_{'warm' if warm else 'cold'}"
+            cases[label] = FIRST_FRAME.format(module=module, cls=cls, method=method, warm=warm)
+
+    results = {}
+    for name, code in cases.items():
+        timings, error = measure(code, args.runs)
+        if timings is None:
+            print(f"⚠ Skipping {name}: {error}")
+            results[name] = {'skipped': error}
+        else:
+            results[name] = {'median_ms': float(np.median(timings) * 1000), 'max_ms': float(max(timings) * 1000)}
+
+    print(f"{'measurement':>28} {'median ms':>10} {'max ms':>9}")
+    for name, row in results.items():
+        if 'skipped' not in row:
+            print(f"{name:>28} {row['median_ms']:>10.1f} {row['max_ms']:>9.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
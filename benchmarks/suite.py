@@ -0,0 +1,185 @@
+"""Benchmark suite for the vision pipeline stages, no camera needed
+
+Replays synthetic frames (and optionally fixture videos) through each stage
+and reports throughput, p50/p95/p99 latency and peak memory. Results are
+written as JSON so runs can be compared:
+
+    python -m benchmarks.suite --gallery-size 3000 --output before.json
+    python -m benchmarks.suite --gallery-size 3000 --output after.json --compare before.json
+    python -m benchmarks.suite --video fixtures/lecture.mp4 --stages recognize_faces draw_face_boxes
+"""
+import argparse
+import json
+import platform
+import time
+from types import SimpleNamespace
+import cv2
+import numpy as np
+from benchmarks.common import measure_stage, synthetic_gallery, synthetic_probes
+
+STAGES = ['match_encodings', 'recognize_faces', 'draw_face_boxes', 'is_hand_raised', 'detect_raised_hand']
+
+
+def synthetic_frames(count, width=1280, height=720, seed=0):
+    """Noisy frames with a few bright face-sized blobs"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        frame = rng.integers(0, 64, (height, width, 3), dtype=np.uint8)
+        for _ in range(4):
+            x, y = rng.integers(0, width - 120), rng.integers(0, height - 150)
+            cv2.ellipse(frame, (int(x + 60), int(y + 75)), (50, 65), 0, 0, 360, (140, 170, 210), -1)
+        frames.append(frame)
+    return frames
+
+
+def video_frames(path, count, step=5):
+    """Every step-th frame of a fixture video, up to count frames"""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    index = 0
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index % step == 0:
+            frames.append(frame)
+        index += 1
+    cap.release()
+    return frames
+
+
+def synthetic_hands(count, seed=0):
+    """Lists of 21 landmark-like objects with normalized x, y, z"""
+    rng = np.random.default_rng(seed)
+    return [[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in rng.random((21, 3))]
+            for _ in range(count)]
+
+
+def synthetic_faces(count, per_frame, width, height, seed=0):
+    """recognize_faces()-style results with random boxes"""
+    rng = np.random.default_rng(seed)
+    faces = []
+    for _ in range(count):
+        frame_faces = []
+        for i in range(per_frame):
+            left, top = int(rng.integers(0, width - 100)), int(rng.integers(40, height - 100))
+            frame_faces.append({'student_id': f"S{i}" if i % 2 else None, 'name': f"Student {i}",
+                                'location': (top, left + 80, top + 80, left), 'confidence': 0.8})
+        faces.append(frame_faces)
+    return faces
+
+
+def load_face_module(gallery_size):
+    """FaceRecognitionModule with a synthetic gallery of the given size"""
+    from face_recognition_module import FaceRecognitionModule
+
+    module = FaceRecognitionModule(encoding_cache=False, quality_gate=False, follow_timetable=False)
+    gallery = synthetic_gallery(gallery_size)
+    module.known_ids = np.array([f"S{i}" for i in range(len(gallery))], dtype=object)
+    module.gallery = gallery
+    module.students = {student_id: {'name': f"Student {student_id}"} for student_id in module.known_ids}
+    module.build_gallery()
+    return module, gallery
+
+
+def run(stages, frames, gallery_size, faces_per_frame, iterations):
+    results = {}
+    height, width = frames[0].shape[:2]
+    face_module = gallery = gesture_module = None
+
+    def skipped(stage, error):
+        print(f"⚠ Skipping {stage}: {error}")
+        results[stage] = {'skipped': str(error)}
+
+    for stage in stages:
+        try:
+            if stage in ('match_encodings', 'recognize_faces', 'draw_face_boxes') and face_module is None:
+                face_module, gallery = load_face_module(gallery_size)
+            if stage in ('is_hand_raised', 'detect_raised_hand') and gesture_module is None:
+                from gesture_detection import GestureDetection
+                gesture_module = GestureDetection()
+        except ImportError as e:
+            skipped(stage, e)
+            continue
+
+        if stage == 'match_encodings':
+            batches = [synthetic_probes(gallery, faces_per_frame, seed=i)[0] for i in range(iterations)]
+            results[stage] = measure_stage(face_module.match_encodings, batches)
+        elif stage == 'recognize_faces':
+            results[stage] = measure_stage(face_module.recognize_faces, frames)
+        elif stage == 'draw_face_boxes':
+            faces = synthetic_faces(len(frames), faces_per_frame, width, height)
+            pairs = [(frame.copy(), frame_faces) for frame, frame_faces in zip(frames, faces)]
+            results[stage] = measure_stage(lambda pair: face_module.draw_face_boxes(*pair), pairs)
+        elif stage == 'is_hand_raised':
+            results[stage] = measure_stage(gesture_module.is_hand_raised, synthetic_hands(iterations))
+        elif stage == 'detect_raised_hand':
+            results[stage] = measure_stage(gesture_module.detect_raised_hand, frames)
+
+    return results
+
+
+def print_results(results, baseline=None):
+    print(f"{'stage':>20} {'calls/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak MB':>8}  vs baseline p50")
+    for stage, row in results.items():
+        if 'skipped' in row:
+            print(f"{stage:>20}  skipped")
+            continue
+
+        delta = ""
+        base = (baseline or {}).get(stage)
+        if base and base.get('p50'):
+            delta = f"{(row['p50'] - base['p50']) / base['p50'] * 100:+.1f}%"
+        print(f"{stage:>20} {row['throughput']:>9.1f} {row['p50']:>9.3f} {row['p95']:>9.3f} "
+              f"{row['p99']:>9.3f} {row['peak_memory_mb']:>8.2f}  {delta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--gallery-size', type=int, default=3000, help="Synthetic enrolled students")
+    parser.add_argument('--faces-per-frame', type=int, default=30)
+    parser.add_argument('--frames', type=int, default=30, help="Frames replayed per frame-based stage")
+    parser.add_argument('--iterations', type=int, default=200, help="Calls for the synthetic-input stages")
+    parser.add_argument('--resolution', default='1280x720', help="Synthetic frame size WxH")
+    parser.add_argument('--video', action='append', default=[], help="Fixture video to replay (repeatable)")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    if args.video:
+        frames = [frame for path in args.video for frame in video_frames(path, args.frames)]
+    else:
+        width, height = (int(v) for v in args.resolution.split('x'))
+        frames = synthetic_frames(args.frames, width, height)
+    if not frames:
+        parser.error("No frames to replay")
+
+    results = run(args.stages, frames, args.gallery_size, args.faces_per_frame, args.iterations)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['stages']
+    print_results(results, baseline)
+
+    if args.output:
+        report = {
+            'meta': {
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'opencv': cv2.__version__,
+                'machine': platform.machine(),
+                'args': vars(args),
+            },
+            'stages': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
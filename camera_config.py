@@ -0,0 +1,104 @@
+import json
+import os
+import cv2
+import numpy as np
+from motion_gate import merge_regions
+
+CAMERA_CONFIG_FILE = "data/cameras.json"
+
+
+class CameraConfig:
+    """Static detection zones and face size limits for one camera
+
+    data/cameras.json maps a camera id (device index, URL or file name) to
+    its settings:
+
+        {
+          "0": {
+            "roi": [[[100, 80], [1180, 80], [1180, 700], [100, 700]]],
+            "ignore": [[[900, 0], [1280, 0], [1280, 300], [900, 300]]],
+            "min_face_size": 32,
+            "max_face_size": 400,
+            "normalized": false
+          }
+        }
+
+    roi polygons limit where detection runs (their bounding boxes are cropped),
+    ignore polygons mask out windows, screens or corridors, and faces outside
+    the size limits are dropped before encoding. With "normalized": true,
+    polygon coordinates are fractions of the frame width and height.
+    """
+
+    def __init__(self, camera_id=None, roi=None, ignore=None, min_face_size=0, max_face_size=None,
+                 normalized=False):
+        self.camera_id = camera_id
+        self.roi = roi or []
+        self.ignore = ignore or []
+        self.min_face_size = min_face_size
+        self.max_face_size = max_face_size
+        self.normalized = normalized
+        self.cache = {}
+
+    def is_default(self):
+        return not self.roi and not self.ignore and not self.min_face_size and self.max_face_size is None
+
+    def polygons(self, polygons, frame_shape):
+        """Polygons as int32 pixel arrays for the given frame size"""
+        height, width = frame_shape[:2]
+        scale = np.array([width, height], dtype=np.float32) if self.normalized else 1
+        return [np.round(np.asarray(polygon, dtype=np.float32) * scale).astype(np.int32) for polygon in polygons]
+
+    def prepare(self, frame_shape):
+        """Rasterize the zones once per frame size: (allowed mask, roi bounding boxes)"""
+        key = frame_shape[:2]
+        if key not in self.cache:
+            height, width = key
+            if self.roi:
+                mask = np.zeros((height, width), dtype=np.uint8)
+                cv2.fillPoly(mask, self.polygons(self.roi, frame_shape), 255)
+            else:
+                mask = np.full((height, width), 255, dtype=np.uint8)
+            if self.ignore:
+                cv2.fillPoly(mask, self.polygons(self.ignore, frame_shape), 0)
+
+            boxes = []
+            for polygon in self.polygons(self.roi, frame_shape):
+                x, y, w, h = cv2.boundingRect(polygon)
+                boxes.append((max(0, y), min(width, x + w), min(height, y + h), max(0, x)))
+
+            self.cache[key] = (mask, merge_regions(boxes) if boxes else None)
+        return self.cache[key]
+
+    def regions(self, frame_shape):
+        """Boxes to crop for detection, or None to scan the whole frame"""
+        return self.prepare(frame_shape)[1]
+
+    def filter_locations(self, face_locations, frame_shape):
+        """Drop faces centred in ignored areas or outside the size limits"""
+        mask, _ = self.prepare(frame_shape)
+        kept = []
+        for location in face_locations:
+            top, right, bottom, left = location
+            size = max(bottom - top, right - left)
+            if size < self.min_face_size or (self.max_face_size and size > self.max_face_size):
+                continue
+
+            center_y = min(max((top + bottom) // 2, 0), mask.shape[0] - 1)
+            center_x = min(max((left + right) // 2, 0), mask.shape[1] - 1)
+            if mask[center_y, center_x]:
+                kept.append(location)
+        return kept
+
+
+def load_camera_configs(path=CAMERA_CONFIG_FILE):
+    """Load all camera configurations, keyed by camera id string"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        raw = json.load(f)
+    return {str(camera_id): CameraConfig(str(camera_id), **settings) for camera_id, settings in raw.items()}
+
+
+def get_camera_config(camera_id, path=CAMERA_CONFIG_FILE):
+    """Configuration for one camera; an unrestricted default when it has none"""
+    return load_camera_configs(path).get(str(camera_id), CameraConfig(str(camera_id)))
@@ -0,0 +1,134 @@
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+
+
+class PendingCheckIn:
+    """A confirmed raised hand waiting for a student ID"""
+
+    def __init__(self, checkin_id, box=None, created_at=None):
+        self.checkin_id = checkin_id
+        self.box = box
+        self.created_at = created_at if created_at is not None else time.monotonic()
+
+
+class CheckInQueue:
+    """Raised-hand check-ins waiting for a student ID, shared between threads
+
+    The frame loop calls add() and never waits. ID sources (the prompt in the
+    Tk app, a keypad or card reader on stdin, a local socket) call submit_id()
+    with each ID they receive; it answers the oldest pending check-in and
+    on_checkin(student_id) marks the attendance. IDs rejected by validate
+    leave the check-in pending, so a mistyped ID can be corrected. Check-ins
+    left unanswered for timeout seconds expire.
+    """
+
+    def __init__(self, on_checkin, validate=None, timeout=60.0, max_pending=50):
+        self.on_checkin = on_checkin
+        self.validate = validate
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.queue = deque()
+        self.next_id = 1
+
+        self.added = 0
+        self.answered = 0
+        self.expired = 0
+        self.rejected = 0
+
+    def expire(self, now):
+        """Drop check-ins older than timeout; call with the lock held"""
+        while self.queue and now - self.queue[0].created_at > self.timeout:
+            self.queue.popleft()
+            self.expired += 1
+
+    def add(self, box=None):
+        """Queue a check-in; returns it, or None if too many are pending"""
+        with self.lock:
+            now = time.monotonic()
+            self.expire(now)
+            if len(self.queue) >= self.max_pending:
+                self.rejected += 1
+                return None
+
+            checkin = PendingCheckIn(self.next_id, box, now)
+            self.next_id += 1
+            self.queue.append(checkin)
+            self.added += 1
+            return checkin
+
+    def pending(self):
+        """Check-ins still waiting for an ID, oldest first"""
+        with self.lock:
+            self.expire(time.monotonic())
+            return list(self.queue)
+
+    def submit_id(self, student_id, checkin_id=None):
+        """Answer the oldest (or the given) pending check-in; returns (success, message)"""
+        student_id = student_id.strip()
+        if not student_id:
+            return False, "No student ID entered"
+        if self.validate is not None and not self.validate(student_id):
+            return False, f"Student ID {student_id} not found"
+
+        with self.lock:
+            self.expire(time.monotonic())
+            checkin = None
+            for candidate in self.queue:
+                if checkin_id is None or candidate.checkin_id == checkin_id:
+                    checkin = candidate
+                    break
+            if checkin is None:
+                return False, "No raised hand is waiting for a student ID"
+            self.queue.remove(checkin)
+            self.answered += 1
+
+        # Outside the lock: marking attendance writes to disk
+        return self.on_checkin(student_id)
+
+    def summary(self):
+        """Counters as a short printable string"""
+        pending = len(self.pending())
+        return (f"Check-ins: {self.added} queued, {self.answered} answered, "
+                f"{self.expired} expired, {self.rejected} rejected, {pending} pending")
+
+
+def read_ids_from_stream(checkins, stream=None):
+    """Answer check-ins with one ID per line, e.g. from a keypad or card reader on stdin"""
+    for line in stream or sys.stdin:
+        if line.strip():
+            success, message = checkins.submit_id(line)
+            print(f"{'✓' if success else '⚠'} {message}")
+
+
+def start_stdin_reader(checkins):
+    """Read IDs from stdin on a daemon thread"""
+    thread = threading.Thread(target=read_ids_from_stream, args=(checkins,), daemon=True)
+    thread.start()
+    return thread
+
+
+def serve_id_socket(checkins, port=9465, host="127.0.0.1"):
+    """Accept IDs, one per line, on a local TCP socket from a background thread
+
+    Each line is answered with the result, so a kiosk or reader script can
+    show it. Returns the server; call shutdown() to stop it.
+    """
+    class IdHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                line = line.decode(errors='replace')
+                if line.strip():
+                    success, message = checkins.submit_id(line)
+                    self.wfile.write(f"{'OK' if success else 'ERROR'} {message}\n".encode())
+
+    class IdServer(socketserver.ThreadingTCPServer):
+        allow_reuse_address = True
+        daemon_threads = True
+
+    server = IdServer((host, port), IdHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,11 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pandas as pd
 from datetime import datetime, date
 from attendance_manager import AttendanceManager
 from student_registration import StudentRegistration
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 class AttendanceDashboard:
     def __init__(self, root):
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+
+def crop_hash(rgb_frame, location, hash_size=8):
+    """Difference hash of a face crop as an int of hash_size * hash_size bits"""
+    top, right, bottom, left = location
+    crop = rgb_frame[max(0, top):bottom, max(0, left):right]
+    if crop.size == 0:
+        return None
+
+    gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class EncodingCache:
+    """LRU cache of recognition results for near-identical face crops
+
+    A student sitting still produces almost the same crop on every keyframe.
+    Entries are keyed by a difference hash of the crop; a lookup only
+    considers entries from the same source (camera or video) whose box is
+    close in position and size, then accepts the first whose hash differs in
+    at most max_hash_distance bits. The hash says little about who is in the
+    crop, so the distance is kept small: a different person sitting down in
+    the same seat must miss. Entries expire ttl seconds after they were
+    stored, and the least recently used entry is evicted beyond max_size.
+    """
+
+    def __init__(self, max_size=256, ttl=10.0, hash_size=8, max_hash_distance=4, max_shift=0.25):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hash_size = hash_size
+        self.max_hash_distance = max_hash_distance
+        self.max_shift = max_shift
+
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.next_key = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def near(self, a, b):
+        """Whether two boxes are at about the same place and of about the same size"""
+        width = a[1] - a[3]
+        if width <= 0 or abs((b[1] - b[3]) - width) > self.max_shift * width:
+            return False
+        dx = (a[1] + a[3]) - (b[1] + b[3])
+        dy = (a[0] + a[2]) - (b[0] + b[2])
+        return abs(dx) / 2 <= self.max_shift * width and abs(dy) / 2 <= self.max_shift * width
+
+    def lookup(self, rgb_frame, location, source=None, now=None):
+        """Return (cached face or None, crop hash to pass to store() on a miss)"""
+        now = now if now is not None else time.monotonic()
+        signature = crop_hash(rgb_frame, location, self.hash_size)
+
+        with self.lock:
+            for key, (stored_source, stored_signature, stored_location, _, face, stored_at) in list(self.entries.items()):
+                if now - stored_at > self.ttl:
+                    del self.entries[key]
+                    continue
+                if signature is None or stored_source != source or not self.near(stored_location, location):
+                    continue
+                if bin(signature ^ stored_signature).count('1') <= self.max_hash_distance:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(face, location=location), signature
+
+            self.misses += 1
+            return None, signature
+
+    def store(self, signature, location, encoding, face, source=None, now=None):
+        """Remember the encoding and recognition result of a crop seen by source"""
+        if signature is None:
+            return
+        now = now if now is not None else time.monotonic()
+
+        with self.lock:
+            self.entries[self.next_key] = (source, signature, location, encoding, face, now)
+            self.next_key += 1
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries, e.g. after the gallery changed or between videos"""
+        with self.lock:
+            self.entries.clear()
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        """Counters as a short printable string"""
+        return f"Encoding cache hit {self.hits} of {self.hits + self.misses} crops ({self.hit_rate():.0%})"
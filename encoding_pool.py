@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import face_recognition
+import numpy as np
+
+# Shared memory blocks attached by this worker process, keyed by name
+attached_blocks = {}
+
+
+def attach_shared_block(name):
+    """Attach to a shared memory block without letting this worker own it"""
+    if name not in attached_blocks:
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13: workers share the parent's resource tracker, so
+            # the extra registration is harmless and close() still unlinks
+            block = shared_memory.SharedMemory(name=name)
+        attached_blocks[name] = block
+    return attached_blocks[name]
+
+
+def encode_shared_frame(name, shape, face_locations, num_jitters):
+    """Worker task: encode faces from a frame living in shared memory"""
+    block = attach_shared_block(name)
+    rgb_frame = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+    return face_recognition.face_encodings(rgb_frame, face_locations, num_jitters=num_jitters)
+
+
+class EncodingPool:
+    """Encode faces in worker processes, passing frames through shared memory
+
+    Frames are copied once into one of a fixed set of preallocated shared
+    memory slots; workers read the pixels in place, so only the slot name,
+    frame shape and face boxes are pickled. The faces of one frame are split
+    across workers so a crowded keyframe uses every core.
+
+    Slots are sized for max_frame_shape, or for the first frame submitted when
+    it is None; a slot is reallocated when a larger frame needs it.
+    """
+
+    def __init__(self, processes=None, slots=None, max_frame_shape=None, num_jitters=1):
+        self.processes = processes or os.cpu_count() or 1
+        self.num_jitters = num_jitters
+        slot_bytes = int(np.prod(max_frame_shape)) if max_frame_shape else 0
+
+        # spawn avoids forking a process that is running capture/GUI threads
+        self.executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+
+        self.slots = [shared_memory.SharedMemory(create=True, size=slot_bytes) if slot_bytes else None
+                      for _ in range(slots or 2)]
+        self.free_slots = list(range(len(self.slots)))
+        self.slot_available = threading.Condition()
+
+    def acquire_slot(self):
+        with self.slot_available:
+            self.slot_available.wait_for(lambda: self.free_slots)
+            return self.free_slots.pop()
+
+    def release_slot(self, slot):
+        with self.slot_available:
+            self.free_slots.append(slot)
+            self.slot_available.notify()
+
+    def submit(self, rgb_frame, face_locations):
+        """Start encoding the given faces; returns a Future of the encodings list
+
+        Blocks only if every shared memory slot is still in use by earlier frames.
+        """
+        result = Future()
+        if not face_locations:
+            result.set_result([])
+            return result
+
+        rgb_frame = np.ascontiguousarray(rgb_frame, dtype=np.uint8)
+
+        slot = self.acquire_slot()
+        block = self.slots[slot]
+        if block is None or block.size < rgb_frame.nbytes:
+            # The slot is ours until released, so no worker is reading it
+            if block is not None:
+                block.close()
+                block.unlink()
+            block = self.slots[slot] = shared_memory.SharedMemory(create=True, size=rgb_frame.nbytes)
+        np.ndarray(rgb_frame.shape, dtype=np.uint8, buffer=block.buf)[:] = rgb_frame
+
+        chunks = [chunk for chunk in np.array_split(np.arange(len(face_locations)), self.processes) if len(chunk)]
+        parts = [self.executor.submit(encode_shared_frame, block.name, rgb_frame.shape,
+                                      [tuple(int(v) for v in face_locations[i]) for i in chunk], self.num_jitters)
+                 for chunk in chunks]
+
+        remaining = [len(parts)]
+        lock = threading.Lock()
+
+        def part_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+
+            self.release_slot(slot)
+            try:
+                encodings = [encoding for part in parts for encoding in part.result()]
+            except Exception as e:
+                result.set_exception(e)
+            else:
+                result.set_result(encodings)
+
+        for part in parts:
+            part.add_done_callback(part_done)
+
+        return result
+
+    def close(self):
+        """Shut down the workers and free the shared memory"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for block in self.slots:
+            if block is not None:
+                block.close()
+                block.unlink()
+        self.slots = []
@@ -0,0 +1,131 @@
+import os
+import threading
+import cv2
+import face_recognition
+import numpy as np
+
+MODELS_DIR = "data/models"
+
+
+class HOGDetector:
+    """dlib HOG detector via face_recognition (the original default)"""
+    name = 'hog'
+
+    def __init__(self, upsample=1):
+        self.upsample = upsample
+
+    def detect(self, rgb_frame):
+        """Return face locations as (top, right, bottom, left) tuples"""
+        return face_recognition.face_locations(rgb_frame, number_of_times_to_upsample=self.upsample)
+
+
+class HaarDetector:
+    """OpenCV Haar cascade - fastest, least accurate on turned faces"""
+    name = 'haar'
+
+    def __init__(self, scale_factor=1.1, min_neighbors=4, min_size=(24, 24),
+                 cascade='haarcascade_frontalface_default.xml'):
+        self.cascade = cv2.CascadeClassifier(cv2.data.haarcascades + cascade)
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def detect(self, rgb_frame):
+        """Return face locations as (top, right, bottom, left) tuples"""
+        gray = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY)
+        faces = self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors, minSize=self.min_size)
+        return [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in faces]
+
+
+class YuNetDetector:
+    """OpenCV DNN YuNet detector (ONNX, runs on CPU)
+
+    Download face_detection_yunet_2023mar.onnx from the OpenCV model zoo into data/models.
+    """
+    name = 'yunet'
+
+    def __init__(self, model_path=None, score_threshold=0.7, nms_threshold=0.3, top_k=200):
+        model_path = model_path or os.path.join(MODELS_DIR, "face_detection_yunet_2023mar.onnx")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"YuNet model not found at {model_path}")
+
+        self.detector = cv2.FaceDetectorYN.create(model_path, "", (320, 320), score_threshold, nms_threshold, top_k)
+        self.input_size = None
+        # The input size is detector state, so threads must not interleave setting it and detecting
+        self.lock = threading.Lock()
+
+    def detect(self, rgb_frame):
+        """Return face locations as (top, right, bottom, left) tuples"""
+        height, width = rgb_frame.shape[:2]
+        # YuNet expects BGR input
+        bgr_frame = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2BGR)
+
+        with self.lock:
+            if self.input_size != (width, height):
+                self.detector.setInputSize((width, height))
+                self.input_size = (width, height)
+            _, faces = self.detector.detect(bgr_frame)
+        if faces is None:
+            return []
+
+        locations = []
+        for x, y, w, h in faces[:, :4]:
+            left, top = max(0, int(x)), max(0, int(y))
+            right, bottom = min(width, int(x + w)), min(height, int(y + h))
+            locations.append((top, right, bottom, left))
+        return locations
+
+
+class SSDDetector:
+    """OpenCV DNN ResNet-10 SSD detector (Caffe or ONNX export, runs on CPU)
+
+    Expects res10_300x300_ssd_iter_140000.caffemodel and deploy.prototxt in
+    data/models, or an ONNX export passed as model_path.
+    """
+    name = 'ssd'
+
+    def __init__(self, model_path=None, config_path=None, confidence_threshold=0.6, input_size=(300, 300)):
+        model_path = model_path or os.path.join(MODELS_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+        if config_path is None and model_path.endswith('.caffemodel'):
+            config_path = os.path.join(MODELS_DIR, "deploy.prototxt")
+        for path in (model_path, config_path):
+            if path and not os.path.exists(path):
+                raise FileNotFoundError(f"SSD model file not found at {path}")
+
+        self.net = cv2.dnn.readNet(model_path, config_path or "")
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.confidence_threshold = confidence_threshold
+        self.input_size = input_size
+        # setInput() and forward() share the network's state between threads
+        self.lock = threading.Lock()
+
+    def detect(self, rgb_frame):
+        """Return face locations as (top, right, bottom, left) tuples"""
+        height, width = rgb_frame.shape[:2]
+        # The model was trained on BGR input; mean is given in RGB order when swapping
+        blob = cv2.dnn.blobFromImage(rgb_frame, 1.0, self.input_size, (123.0, 177.0, 104.0), swapRB=True)
+        with self.lock:
+            self.net.setInput(blob)
+            detections = self.net.forward().reshape(-1, 7)
+
+        detections = detections[detections[:, 2] >= self.confidence_threshold]
+        boxes = np.clip(detections[:, 3:7], 0, 1) * np.array([width, height, width, height])
+
+        return [(int(top), int(right), int(bottom), int(left))
+                for left, top, right, bottom in boxes if right > left and bottom > top]
+
+
+DETECTORS = {
+    HOGDetector.name: HOGDetector,
+    HaarDetector.name: HaarDetector,
+    YuNetDetector.name: YuNetDetector,
+    SSDDetector.name: SSDDetector,
+}
+
+
+def create_detector(name='hog', **options):
+    """Create a face detector backend by name"""
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown face detector '{name}'. Available: {', '.join(DETECTORS)}")
+    return DETECTORS[name](**options)
@@ -0,0 +1,51 @@
+def location_iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes"""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    if bottom <= top or right <= left:
+        return 0.0
+
+    intersection = (bottom - top) * (right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return intersection / float(area_a + area_b - intersection)
+
+
+def scale_location(location, scale, frame_shape=None):
+    """Map a (top, right, bottom, left) box found on a resized frame back to full resolution"""
+    top, right, bottom, left = (int(round(v / scale)) for v in location)
+    if frame_shape is not None:
+        height, width = frame_shape[:2]
+        top, left = max(0, top), max(0, left)
+        bottom, right = min(height, bottom), min(width, right)
+    return (top, right, bottom, left)
+
+
+def suppress_duplicates(locations, iou_threshold=0.4):
+    """Drop boxes overlapping an earlier, larger box (simple non-maximum suppression)"""
+    def area(loc):
+        return (loc[2] - loc[0]) * (loc[1] - loc[3])
+
+    kept = []
+    for location in sorted(locations, key=area, reverse=True):
+        if all(location_iou(location, other) < iou_threshold for other in kept):
+            kept.append(location)
+    return kept
+
+
+def area_fraction(locations, frame_shape):
+    """Fraction of the frame covered by non-overlapping (top, right, bottom, left) boxes"""
+    area = sum((bottom - top) * (right - left) for top, right, bottom, left in locations)
+    return area / float(frame_shape[0] * frame_shape[1])
+
+
+def intersect_regions(regions, limits):
+    """Pairwise intersections of two lists of (top, right, bottom, left) boxes"""
+    intersections = []
+    for a in regions:
+        for b in limits:
+            top, bottom = max(a[0], b[0]), min(a[2], b[2])
+            left, right = max(a[3], b[3]), min(a[1], b[1])
+            if bottom > top and right > left:
+                intersections.append((top, right, bottom, left))
+    return intersections
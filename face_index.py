@@ -0,0 +1,252 @@
+import numpy as np
+
+
+def squared_distances(queries, matrix, matrix_sq_norms=None):
+    """Squared euclidean distances between every query row and every matrix row"""
+    if matrix_sq_norms is None:
+        matrix_sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+
+    query_sq_norms = np.einsum('ij,ij->i', queries, queries)
+    sq_distances = query_sq_norms[:, None] - 2 * (queries @ matrix.T) + matrix_sq_norms[None, :]
+    np.maximum(sq_distances, 0, out=sq_distances)
+    return sq_distances
+
+
+def top_k(sq_distances, k):
+    """Return (squared distances, column indices) of the k smallest entries per row, sorted"""
+    k = min(k, sq_distances.shape[1])
+    if k < sq_distances.shape[1]:
+        candidates = np.argpartition(sq_distances, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(sq_distances.shape[1]), sq_distances.shape)
+
+    candidate_distances = np.take_along_axis(sq_distances, candidates, axis=1)
+    order = np.argsort(candidate_distances, axis=1)
+    return np.take_along_axis(candidate_distances, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+
+class ExactIndex:
+    """Brute-force search over the whole gallery"""
+
+    def __init__(self, matrix):
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.sq_norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def search(self, queries, k=1):
+        """Find the k nearest gallery rows for each query
+
+        Returns (distances, indices) arrays of shape (n_queries, k). Missing
+        neighbours are padded with inf / -1.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+
+        if len(self.matrix) == 0 or len(queries) == 0:
+            return distances, indices
+
+        sq_distances, rows = top_k(squared_distances(queries, self.matrix, self.sq_norms), k)
+        distances[:, :rows.shape[1]] = np.sqrt(sq_distances)
+        indices[:, :rows.shape[1]] = rows
+        return distances, indices
+
+
+class IVFIndex:
+    """Inverted-file index: k-means partitions the gallery and only the
+    n_probe closest partitions are scanned per query.
+
+    n_probe is the recall/latency knob - raising it scans more partitions,
+    increasing recall at the cost of per-query latency.
+    """
+
+    def __init__(self, matrix, n_lists=None, n_probe=16, n_iter=10, train_size=20000, seed=0):
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.n_lists = n_lists or max(1, int(4 * np.sqrt(len(matrix))))
+        self.n_lists = min(self.n_lists, len(matrix))
+        self.n_probe = n_probe
+
+        rng = np.random.default_rng(seed)
+        self.centroids = self.train_centroids(matrix, n_iter, train_size, rng)
+        self.centroid_sq_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+
+        # Store the gallery grouped by partition so each list is a contiguous slice
+        assignments = self.assign(matrix)
+        order = np.argsort(assignments, kind='stable')
+        self.matrix = matrix[order]
+        self.sq_norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+        self.row_ids = order
+        self.offsets = np.searchsorted(assignments[order], np.arange(self.n_lists + 1))
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def train_centroids(self, matrix, n_iter, train_size, rng):
+        """Run Lloyd's k-means on a sample of the gallery"""
+        if len(matrix) > train_size:
+            sample = matrix[rng.choice(len(matrix), train_size, replace=False)]
+        else:
+            sample = matrix
+
+        centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            labels = np.argmin(squared_distances(sample, centroids), axis=1)
+            counts = np.bincount(labels, minlength=self.n_lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+
+            # Empty partitions keep their previous centroid
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+
+        return centroids
+
+    def assign(self, matrix, chunk_size=8192):
+        """Assign each row to its closest centroid"""
+        labels = np.empty(len(matrix), dtype=np.int64)
+        for start in range(0, len(matrix), chunk_size):
+            chunk = matrix[start:start + chunk_size]
+            labels[start:start + chunk_size] = np.argmin(
+                squared_distances(chunk, self.centroids, self.centroid_sq_norms), axis=1
+            )
+        return labels
+
+    def search(self, queries, k=1, n_probe=None):
+        """Find the approximate k nearest gallery rows for each query
+
+        Returns (distances, indices) arrays of shape (n_queries, k), indices
+        referring to rows of the matrix the index was built from.
+        """
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.matrix.shape[1])
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+
+        if len(self.matrix) == 0 or len(queries) == 0:
+            return distances, indices
+
+        _, probes = top_k(squared_distances(queries, self.centroids, self.centroid_sq_norms), n_probe)
+
+        for query_index, lists in enumerate(probes):
+            rows = np.concatenate([
+                np.arange(self.offsets[list_id], self.offsets[list_id + 1]) for list_id in lists
+            ])
+            if len(rows) == 0:
+                continue
+
+            sq_distances = squared_distances(
+                queries[query_index:query_index + 1], self.matrix[rows], self.sq_norms[rows]
+            )
+            best_sq_distances, best = top_k(sq_distances, k)
+            found = best.shape[1]
+            distances[query_index, :found] = np.sqrt(best_sq_distances[0])
+            indices[query_index, :found] = self.row_ids[rows[best[0]]]
+
+        return distances, indices
+
+
+def quantize_int8(matrix):
+    """Quantize rows to int8 with one float32 scale per row"""
+    matrix = np.asarray(matrix, dtype=np.float32).reshape(-1, matrix.shape[-1])
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(matrix / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes, scales):
+    """Inverse of quantize_int8 (up to rounding error)"""
+    return codes.astype(np.float32) * np.asarray(scales, dtype=np.float32).reshape(-1, 1)
+
+
+class QuantizedIndex:
+    """int8 gallery scan, optionally followed by an exact re-rank of the top candidates
+
+    The gallery is held as int8 codes with a per-vector scale (4x smaller than
+    float32). Each query scans the codes and keeps the closest candidates.
+    With exact_vectors (the float source, indexable by row) the rerank closest
+    candidates get their distances recomputed on it. Without it the int8
+    distances are final, which is exact when the gallery was enrolled as int8.
+    """
+
+    def __init__(self, codes, scales, exact_vectors=None, rerank=16, chunk_size=16384):
+        self.codes = np.ascontiguousarray(codes, dtype=np.int8)
+        self.scales = np.asarray(scales, dtype=np.float32)
+        self.code_sq_norms = np.einsum('ij,ij->i', self.codes.astype(np.float32), self.codes.astype(np.float32))
+        self.exact_vectors = exact_vectors
+        self.rerank = rerank
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return len(self.codes)
+
+    def approximate_sq_distances(self, queries):
+        """Squared distances to the dequantized gallery, scanned in chunks"""
+        query_sq_norms = np.einsum('ij,ij->i', queries, queries)
+        sq_distances = np.empty((len(queries), len(self.codes)), dtype=np.float32)
+
+        # |q - s c|^2 = |q|^2 - 2 s (q . c) + s^2 |c|^2; chunks bound the float copy of the codes
+        for start in range(0, len(self.codes), self.chunk_size):
+            end = start + self.chunk_size
+            scales = self.scales[start:end]
+            dots = queries @ self.codes[start:end].T.astype(np.float32)
+            sq_distances[:, start:end] = (query_sq_norms[:, None] - 2 * scales[None, :] * dots
+                                          + (scales ** 2 * self.code_sq_norms[start:end])[None, :])
+
+        np.maximum(sq_distances, 0, out=sq_distances)
+        return sq_distances
+
+    def search(self, queries, k=1):
+        """Find the k nearest gallery rows for each query, re-ranked on exact vectors if held
+
+        Returns (distances, indices) arrays of shape (n_queries, k).
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.codes.shape[1])
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+
+        if len(self.codes) == 0 or len(queries) == 0:
+            return distances, indices
+
+        sq_distances = self.approximate_sq_distances(queries)
+        if self.exact_vectors is None:
+            best_sq_distances, best = top_k(sq_distances, k)
+            distances[:, :best.shape[1]] = np.sqrt(best_sq_distances)
+            indices[:, :best.shape[1]] = best
+            return distances, indices
+
+        _, candidates = top_k(sq_distances, max(k, self.rerank))
+        for query_index, rows in enumerate(candidates):
+            exact = np.asarray(self.exact_vectors[rows], dtype=np.float32)
+            best_sq_distances, best = top_k(squared_distances(queries[query_index:query_index + 1], exact), k)
+            found = best.shape[1]
+            distances[query_index, :found] = np.sqrt(best_sq_distances[0])
+            indices[query_index, :found] = rows[best[0]]
+
+        return distances, indices
+
+
+def build_index(matrix, index_type='auto', exact_threshold=10000, n_probe=16, exact_vectors=None, **kwargs):
+    """Build a search index over a gallery matrix
+
+    index_type is 'exact', 'ivf', 'int8' or 'auto'. 'auto' uses exact search
+    for galleries smaller than exact_threshold, where a linear scan is already
+    fast and partitioning would only cost recall. 'int8' re-ranks against
+    exact_vectors (defaults to matrix itself).
+    """
+    if index_type == 'auto':
+        index_type = 'exact' if len(matrix) < exact_threshold else 'ivf'
+
+    if index_type == 'exact' or len(matrix) == 0:
+        return ExactIndex(matrix)
+    if index_type == 'ivf':
+        return IVFIndex(matrix, n_probe=n_probe, **kwargs)
+    if index_type == 'int8':
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        codes, scales = quantize_int8(matrix)
+        return QuantizedIndex(codes, scales, matrix if exact_vectors is None else exact_vectors, **kwargs)
+
+    raise ValueError(f"Unknown index type: {index_type}")
@@ -0,0 +1,83 @@
+import cv2
+import face_recognition
+import numpy as np
+
+
+class FaceQualityGate:
+    """Cheap per-crop checks that run before the expensive encoding step
+
+    - blur: variance of the Laplacian on the crop resized to a fixed size,
+      so the score does not depend on how large the face is
+    - lighting: mean luminance of the crop
+    - pose: horizontal offset of the nose tip from the eye midpoint, relative
+      to the eye distance, from the 5-point landmark model (only computed for
+      crops that pass the pixel checks)
+
+    Crops that fail are not encoded; the counters record why.
+    """
+
+    def __init__(self, min_sharpness=25.0, min_brightness=40, max_brightness=220, max_yaw=0.5,
+                 check_pose=True, sample_size=64):
+        self.min_sharpness = min_sharpness
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.max_yaw = max_yaw
+        self.check_pose = check_pose
+        self.sample_size = sample_size
+
+        self.checked = 0
+        self.skipped = {'blur': 0, 'dark': 0, 'bright': 0, 'pose': 0}
+
+    def assess(self, rgb_frame, location):
+        """Return None if the crop is good enough to encode, else the reason it is not"""
+        top, right, bottom, left = location
+        crop = rgb_frame[max(0, top):bottom, max(0, left):right]
+        if crop.size == 0:
+            return 'blur'
+
+        gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+        gray = cv2.resize(gray, (self.sample_size, self.sample_size), interpolation=cv2.INTER_AREA)
+
+        brightness = gray.mean()
+        if brightness < self.min_brightness:
+            return 'dark'
+        if brightness > self.max_brightness:
+            return 'bright'
+
+        if cv2.Laplacian(gray, cv2.CV_64F).var() < self.min_sharpness:
+            return 'blur'
+
+        if self.check_pose:
+            landmarks = face_recognition.face_landmarks(rgb_frame, [location], model='small')
+            if landmarks:
+                points = landmarks[0]
+                left_eye = np.mean(points['left_eye'], axis=0)
+                right_eye = np.mean(points['right_eye'], axis=0)
+                nose = np.mean(points['nose_tip'], axis=0)
+                eye_distance = np.linalg.norm(right_eye - left_eye)
+                if eye_distance > 0:
+                    yaw = abs(nose[0] - (left_eye[0] + right_eye[0]) / 2) / eye_distance
+                    if yaw > self.max_yaw:
+                        return 'pose'
+
+        return None
+
+    def split(self, rgb_frame, face_locations):
+        """Return (indices to encode, {index: reason} for skipped crops)"""
+        accepted = []
+        rejected = {}
+        for index, location in enumerate(face_locations):
+            self.checked += 1
+            reason = self.assess(rgb_frame, location)
+            if reason is None:
+                accepted.append(index)
+            else:
+                self.skipped[reason] += 1
+                rejected[index] = reason
+        return accepted, rejected
+
+    def summary(self):
+        """Counters as a short printable string"""
+        skipped = sum(self.skipped.values())
+        details = ", ".join(f"{reason} {count}" for reason, count in self.skipped.items() if count)
+        return f"Quality gate skipped {skipped} of {self.checked} crops" + (f" ({details})" if details else "")
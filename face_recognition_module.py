@@ -1,56 +1,395 @@
 import cv2
 import face_recognition
+import time
 import numpy as np
+from concurrent.futures import Future
+from face_index import QuantizedIndex, build_index, dequantize_int8, quantize_int8
+from face_detectors import create_detector
+from encoding_cache import EncodingCache
+from encoding_pool import EncodingPool
+from camera_config import get_camera_config
+from face_geometry import intersect_regions, scale_location, suppress_duplicates
+from face_quality import FaceQualityGate
+from face_tracker import FaceTracker
+from frame_capture import camera_service, convert_color
+from frame_scheduler import AdaptiveScheduler
+from motion_gate import MotionGate
+from profiling import StageProfiler
+from recognition_pipeline import RecognitionPipeline
 from student_registration import StudentRegistration
 from attendance_manager import AttendanceManager
 
 class FaceRecognitionModule:
-    def __init__(self):
+    def __init__(self, index_type='auto', index_probe=16, detection_scale=0.5,
+                 detector='hog', detector_options=None, encoding_processes=0, metrics_port=None,
+                 camera_id=0, quality_gate=True, encoding_cache=True, course_id=None,
+                 follow_timetable=True, encoding_frame_shape=None):
         self.student_reg = StudentRegistration()
         self.attendance_mgr = AttendanceManager()
-        self.known_encodings = self.student_reg.get_known_encodings()
         self.students = self.student_reg.get_all_students()
         self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        self.match_tolerance = 0.6
+        self.index_type = index_type
+        self.index_probe = index_probe
         
+        # Faces are matched against the roster of this course first. Without
+        # one, the course in session is looked up in the timetable again
+        # every roster_check_interval seconds
+        self.course_id = course_id
+        self.follow_timetable = follow_timetable
+        self.roster_check_interval = 60.0
+        self.roster_checked_at = None
+        self.roster = None
+        self.roster_matches = 0
+        self.roster_fallbacks = 0
+        
+        # A single scale, or several scales forming a small detection pyramid
+        if isinstance(detection_scale, (int, float)):
+            detection_scale = (detection_scale,)
+        self.detection_scales = tuple(detection_scale)
+        
+        # Detector backend: 'hog', 'haar', 'yunet' or 'ssd'
+        self.detector = create_detector(detector, **(detector_options or {}))
+        
+        # Detection zones and face size limits of the default camera
+        self.camera_config = get_camera_config(camera_id)
+        
+        # Blurry, badly lit or turned-away crops are not worth encoding
+        self.quality_gate = FaceQualityGate() if quality_gate else None
+        
+        # Results for crops that barely changed since they were last encoded
+        self.encoding_cache = EncodingCache() if encoding_cache else None
+        
+        # Optional pool of worker processes for face encoding, running only
+        # while a mode uses it (see open_encoding_pool)
+        self.encoding_processes = encoding_processes
+        self.encoding_frame_shape = encoding_frame_shape
+        self.encoding_pool = None
+        
+        # Per-stage timings for the overlay, log lines and Prometheus metrics
+        self.profiler = StageProfiler('face')
+        if metrics_port:
+            self.profiler.serve(metrics_port)
+        
+        self.load_gallery()
+        
+    def warm_up(self, frame_shape=(480, 640, 3)):
+        """Run detection and encoding once so the first real frame does not pay for initialization"""
+        blank = np.zeros(frame_shape, dtype=np.uint8)
+        self.detect_at_scales(blank)
+        face_recognition.face_encodings(blank, [(0, 150, 150, 0)])
+    
+    def open_encoding_pool(self):
+        """Start the encoding worker processes if configured and not running yet"""
+        if self.encoding_processes and self.encoding_pool is None:
+            self.encoding_pool = EncodingPool(self.encoding_processes, max_frame_shape=self.encoding_frame_shape)
+    
+    def close_encoding_pool(self):
+        """Stop the encoding workers and free their shared memory"""
+        if self.encoding_pool is not None:
+            self.encoding_pool.close()
+            self.encoding_pool = None
+    
     def refresh_data(self):
         """Refresh student and encoding data"""
-        self.known_encodings = self.student_reg.get_known_encodings()
+        self.student_reg.load_courses()
+        self.roster_checked_at = None
+        self.student_reg.load_students()
         self.students = self.student_reg.get_all_students()
+        self.load_gallery()
+        if self.encoding_cache is not None:
+            self.encoding_cache.clear()
     
-    def recognize_faces(self, frame):
-        """Recognize faces in the given frame"""
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def load_gallery(self):
+        """Read the enrolled encodings from disk and index them"""
+        student_ids, self.gallery = self.student_reg.read_gallery()
+        self.known_ids = np.array(student_ids, dtype=object)
+        self.build_gallery()
+    
+    def build_gallery(self):
+        """Index self.known_ids / self.gallery for batched matching"""
+        self.index = self.build_gallery_index(self.gallery, self.index_type)
+        
+        # Roster positions refer to the gallery, so rebuild the roster with it
+        if self.roster is not None:
+            self.update_roster(force=True)
+    
+    def build_gallery_index(self, gallery, index_type):
+        """Search index over a float32 matrix or an int8 (codes, scales) gallery
         
-        # Find face locations and encodings
-        face_locations = face_recognition.face_locations(rgb_frame)
-        face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
+        An int8 index over a float32 gallery re-ranks its top candidates on the
+        float32 rows. Over an int8 gallery only the codes are held: they are
+        the enrolled vectors, so there is nothing more exact to re-rank on.
+        """
+        if isinstance(gallery, tuple):
+            codes, scales = gallery
+            if index_type == 'int8':
+                return QuantizedIndex(codes, scales)
+            gallery = dequantize_int8(codes, scales)
         
-        recognized_faces = []
+        if index_type == 'int8':
+            codes, scales = quantize_int8(gallery)
+            return QuantizedIndex(codes, scales, exact_vectors=gallery)
+        return build_index(gallery, index_type, n_probe=self.index_probe)
+    
+    def update_roster(self, force=False):
+        """Build the sub-gallery of the course in session, if any
+        
+        The timetable is consulted at most every roster_check_interval seconds.
+        """
+        now = time.monotonic()
+        if not force and self.roster_checked_at is not None and \
+                now - self.roster_checked_at < self.roster_check_interval:
+            return
+        self.roster_checked_at = now
+        
+        course_id = self.course_id
+        if course_id is None and self.follow_timetable:
+            course_id = self.student_reg.get_active_course()
+        if course_id is None:
+            self.roster = None
+            return
+        if self.roster is not None and self.roster[0] == course_id and not force:
+            return
+        
+        enrolled = set(self.student_reg.get_roster(course_id))
+        positions = [i for i, student_id in enumerate(self.known_ids) if student_id in enrolled]
+        if not positions:
+            self.roster = None
+            return
+        
+        if isinstance(self.gallery, tuple):
+            codes, scales = self.gallery
+            subset = (codes[positions], scales[positions])
+        else:
+            subset = self.gallery[positions]
+        index = self.build_gallery_index(subset, 'int8' if self.index_type == 'int8' else 'auto')
+        
+        # Swapped in one assignment so worker threads never see a mixed state
+        self.roster = (course_id, self.known_ids[positions], index)
+        print(f"Matching against the {course_id} roster ({len(positions)} students) first")
+    
+    def match_encodings(self, face_encodings):
+        """Match all face encodings against the gallery in one batch
+        
+        When a course is in session, faces are matched against its roster
+        first and only faces without a roster match are searched in the full
+        gallery.
+        
+        Returns a list of (student_id, distance, confidence) tuples, one per encoding.
+        """
+        if len(face_encodings) == 0:
+            return []
+        if len(self.known_ids) == 0:
+            return [(None, None, 0) for _ in face_encodings]
         
-        for face_encoding, face_location in zip(face_encodings, face_locations):
-            # Compare with known faces
-            matches = []
-            face_distances = []
+        self.update_roster()
+        roster = self.roster
+        if roster is None:
+            return self.search_gallery(self.index, self.known_ids, face_encodings)
+        
+        _, roster_ids, roster_index = roster
+        matches = self.search_gallery(roster_index, roster_ids, face_encodings)
+        unmatched = [i for i, (student_id, _, _) in enumerate(matches) if student_id is None]
+        
+        if unmatched:
+            fallback = self.search_gallery(self.index, self.known_ids, np.asarray(face_encodings)[unmatched])
+            for i, match in zip(unmatched, fallback):
+                matches[i] = match
+        
+        self.roster_matches += len(matches) - len(unmatched)
+        self.roster_fallbacks += len(unmatched)
+        return matches
+    
+    def search_gallery(self, index, ids, face_encodings):
+        """Nearest gallery entry for each encoding, as (student_id, distance, confidence)"""
+        distances, indices = index.search(face_encodings, k=1)
+        best_indices = indices[:, 0]
+        best_distances = distances[:, 0]
+        
+        matches = []
+        for best_index, distance in zip(best_indices, best_distances):
+            distance = float(distance)
+            if best_index >= 0 and distance <= self.match_tolerance:
+                matches.append((ids[best_index], distance, 1 - distance))
+            else:
+                matches.append((None, distance, 0))
+        
+        return matches
+    
+    def detect_faces(self, rgb_frame, regions=None, camera=None):
+        """Find face locations, optionally only inside the given regions
+        
+        Regions are (top, right, bottom, left) boxes; detections inside them are
+        mapped back to full-frame coordinates. The camera's configured zones
+        further restrict the regions, and faces in ignored areas or outside its
+        size limits are dropped.
+        """
+        camera = camera or self.camera_config
+        
+        with self.profiler.stage('face_locations'):
+            zones = camera.regions(rgb_frame.shape)
+            if zones is not None:
+                regions = zones if regions is None else intersect_regions(regions, zones)
             
-            if self.known_encodings:
-                known_ids = list(self.known_encodings.keys())
-                known_encodings_list = list(self.known_encodings.values())
-                
-                matches = face_recognition.compare_faces(known_encodings_list, face_encoding, tolerance=0.6)
-                face_distances = face_recognition.face_distance(known_encodings_list, face_encoding)
+            if regions is None:
+                face_locations = self.detect_at_scales(rgb_frame)
+            else:
+                face_locations = []
+                for top, right, bottom, left in regions:
+                    crop = rgb_frame[top:bottom, left:right]
+                    if crop.size == 0:
+                        continue
+                    for t, r, b, l in self.detect_at_scales(crop):
+                        face_locations.append((t + top, r + left, b + top, l + left))
+                face_locations = suppress_duplicates(face_locations)
             
-            name = "Unknown"
-            student_id = None
-            confidence = 0
+            if camera.is_default():
+                return face_locations
+            return camera.filter_locations(face_locations, rgb_frame.shape)
+    
+    def detect_at_scales(self, rgb_frame):
+        """Find face locations on downscaled copies of the frame
+        
+        Boxes are mapped back to full-resolution (top, right, bottom, left) coordinates.
+        """
+        face_locations = []
+        
+        for scale in self.detection_scales:
+            if scale == 1:
+                small_frame = np.ascontiguousarray(rgb_frame)
+            else:
+                small_frame = cv2.resize(rgb_frame, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
             
-            if matches and True in matches:
-                # Find the best match
-                best_match_index = np.argmin(face_distances)
-                if matches[best_match_index]:
-                    student_id = known_ids[best_match_index]
-                    name = self.students[student_id]['name']
-                    confidence = 1 - face_distances[best_match_index]
+            for location in self.detector.detect(small_frame):
+                face_locations.append(scale_location(location, scale, rgb_frame.shape))
+        
+        # The same face may be found at several pyramid levels
+        if len(self.detection_scales) > 1:
+            face_locations = suppress_duplicates(face_locations)
+        
+        return face_locations
+    
+    def recognize_faces(self, frame, camera=None):
+        """Recognize faces in the given frame, using camera's zones if given"""
+        # Convert BGR to RGB
+        with self.profiler.stage('cvtColor'):
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        
+        # Detect on a shrunken copy, encode from the original pixels
+        face_locations = self.detect_faces(rgb_frame, camera=camera)
+        
+        return self.identify_faces(rgb_frame, face_locations, source=(camera or self.camera_config).camera_id)
+    
+    def identify_faces(self, rgb_frame, face_locations, source=None):
+        """Encode the given face locations and match them against the gallery
+        
+        Crops rejected by the quality gate are not encoded; they are returned
+        as unknown faces with a 'quality' key naming the reason. Crops nearly
+        identical to one recently encoded from the same source (camera id)
+        reuse its cached result.
+        """
+        if not face_locations:
+            return []
+        
+        to_encode, resolved, signatures = self.prepare_identification(rgb_frame, face_locations, source)
+        
+        face_encodings = []
+        if to_encode:
+            with self.profiler.stage('face_encodings'):
+                face_encodings = face_recognition.face_encodings(rgb_frame, [face_locations[i] for i in to_encode])
+        
+        return self.finish_identification(face_locations, to_encode, face_encodings, resolved, signatures, source)
+    
+    def submit_identification(self, rgb_frame, face_locations, source=None):
+        """Encode faces in the worker pool without blocking
+        
+        Returns a Future resolving to the same list identify_faces() returns.
+        Falls back to encoding inline when no pool is configured.
+        """
+        result = Future()
+        if self.encoding_pool is None or not face_locations:
+            result.set_result(self.identify_faces(rgb_frame, face_locations, source))
+            return result
+        
+        to_encode, resolved, signatures = self.prepare_identification(rgb_frame, face_locations, source)
+        if not to_encode:
+            result.set_result(self.finish_identification(face_locations, [], [], resolved, signatures, source))
+            return result
+        
+        def encoded(encodings_future):
+            try:
+                result.set_result(self.finish_identification(
+                    face_locations, to_encode, encodings_future.result(), resolved, signatures, source
+                ))
+            except Exception as e:
+                result.set_exception(e)
+        
+        self.encoding_pool.submit(rgb_frame, [face_locations[i] for i in to_encode]).add_done_callback(encoded)
+        return result
+    
+    def prepare_identification(self, rgb_frame, face_locations, source=None):
+        """Work out which faces actually need encoding
+        
+        Returns (indices to encode, {index: face} for faces resolved without
+        encoding, {index: crop hash} for storing new results in the cache).
+        """
+        resolved = {}
+        signatures = {}
+        
+        if self.quality_gate is None:
+            accepted = list(range(len(face_locations)))
+        else:
+            with self.profiler.stage('quality'):
+                accepted, rejected = self.quality_gate.split(rgb_frame, face_locations)
+            for index, reason in rejected.items():
+                resolved[index] = {
+                    'student_id': None,
+                    'name': "Unknown",
+                    'location': face_locations[index],
+                    'confidence': 0,
+                    'quality': reason
+                }
+        
+        if self.encoding_cache is None:
+            return accepted, resolved, signatures
+        
+        to_encode = []
+        with self.profiler.stage('encoding_cache'):
+            for index in accepted:
+                face, signature = self.encoding_cache.lookup(rgb_frame, face_locations[index], source)
+                if face is None:
+                    to_encode.append(index)
+                    signatures[index] = signature
+                else:
+                    resolved[index] = face
+        
+        return to_encode, resolved, signatures
+    
+    def finish_identification(self, face_locations, to_encode, face_encodings, resolved, signatures, source=None):
+        """Match new encodings, cache them and restore the original face order"""
+        recognized_faces = self.build_recognized_faces([face_locations[i] for i in to_encode], face_encodings)
+        
+        if self.encoding_cache is not None:
+            for index, encoding, face in zip(to_encode, face_encodings, recognized_faces):
+                self.encoding_cache.store(signatures[index], face_locations[index], encoding, face, source)
+        
+        if not resolved:
+            return recognized_faces
+        
+        recognized = iter(recognized_faces)
+        return [resolved[index] if index in resolved else next(recognized) for index in range(len(face_locations))]
+    
+    def build_recognized_faces(self, face_locations, face_encodings):
+        """Match encodings and pair them with their locations"""
+        recognized_faces = []
+        
+        # Match every face in the frame against the gallery at once
+        with self.profiler.stage('matching'):
+            matches = self.match_encodings(face_encodings)
+        
+        for (student_id, distance, confidence), face_location in zip(matches, face_locations):
+            name = self.students[student_id]['name'] if student_id else "Unknown"
             
             recognized_faces.append({
                 'student_id': student_id,
@@ -61,6 +400,21 @@ class FaceRecognitionModule:
         
         return recognized_faces
     
+    def mark_recognized(self, recognized_faces, recently_marked, mode="Face Recognition"):
+        """Mark attendance for confidently recognized faces not marked recently"""
+        for face in recognized_faces:
+            if face['student_id'] and face['confidence'] > 0.5:
+                if face['student_id'] not in recently_marked:
+                    with self.profiler.stage('mark_attendance'):
+                        success, message = self.attendance_mgr.mark_attendance(
+                            face['student_id'], face['name'], mode
+                        )
+                    if success:
+                        print(f"✓ {message}")
+                        recently_marked.add(face['student_id'])
+                    else:
+                        print(f"⚠ {message}")
+    
     def draw_face_boxes(self, frame, recognized_faces):
         """Draw bounding boxes and labels on faces"""
         for face in recognized_faces:
@@ -86,79 +440,169 @@ class FaceRecognitionModule:
         
         return frame
     
-    def start_face_recognition_mode(self):
-        """Start face recognition attendance mode"""
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+    def start_face_recognition_mode(self, motion_gating=True, latency_budget=0.5, dedup_window=10.0,
+                                    still_keyframe_interval=3.0):
+        """Start face recognition attendance mode
+        
+        With motion gating, a full-frame keyframe still runs every
+        still_keyframe_interval seconds while the room is still but some face
+        is unidentified or due for re-verification.
+        """
+        capture = camera_service.acquire(0)
+        if not capture.is_opened():
             return False, "Could not access camera"
         
         print("Face Recognition Mode Started")
-        print("Press 'q' to quit, 'r' to refresh student data")
+        print("Press 'q' to quit, 'r' to refresh student data, 'p' to toggle performance overlay")
         
         # Track recently marked students to avoid duplicate marking
         recently_marked = set()
-        frame_count = 0
+        window_started = time.monotonic()
         
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Flip frame horizontally for mirror effect
-            frame = cv2.flip(frame, 1)
-            
-            # Process every 5th frame for performance
-            if frame_count % 5 == 0:
-                recognized_faces = self.recognize_faces(frame)
+        # Recognition runs as often as the latency budget and CPU headroom allow
+        scheduler = AdaptiveScheduler(latency_budget)
+        
+        # Identities are carried between keyframes so only new or stale tracks are encoded
+        tracker = FaceTracker()
+        pending = []
+        
+        # Skip detection entirely while nothing in the room moves
+        motion_gate = MotionGate() if motion_gating else None
+        last_keyframe = 0.0
+        
+        profiler = self.profiler
+        
+        # Frames and conversions are written into buffers reused across frames.
+        # Gray frames alternate between two buffers because the tracker keeps
+        # the previous one for optical flow.
+        frame_id, frame, rgb_frame = 0, None, None
+        gray_frame, spare_gray = None, None
+        
+        self.open_encoding_pool()
+        try:
+            while True:
+                # The service delivers frames already mirrored
+                with profiler.stage('capture'):
+                    frame_id, new_frame, _ = capture.read(frame_id, out=frame)
+                if new_frame is None:
+                    if not capture.running:
+                        break
+                    continue
+                frame = new_frame
                 
-                # Mark attendance for recognized faces
-                for face in recognized_faces:
-                    if face['student_id'] and face['confidence'] > 0.5:
-                        if face['student_id'] not in recently_marked:
-                            success, message = self.attendance_mgr.mark_attendance(
-                                face['student_id'], face['name'], "Face Recognition"
-                            )
-                            if success:
-                                print(f"✓ {message}")
-                                recently_marked.add(face['student_id'])
-                            else:
-                                print(f"⚠ {message}")
-            else:
-                # Use previous recognition results for display
-                if 'recognized_faces' in locals():
-                    pass
+                # Move existing boxes along with the faces on every frame
+                with profiler.stage('tracking'):
+                    gray_frame, spare_gray = convert_color(frame, cv2.COLOR_BGR2GRAY, dst=spare_gray), gray_frame
+                    tracker.predict(gray_frame)
+                
+                # Detect when the scheduler says so while there is motion, and immediately when motion starts
+                now = time.monotonic()
+                if motion_gate is not None:
+                    with profiler.stage('motion_gate'):
+                        motion, motion_started, regions = motion_gate.update(gray_frame)
+                    keyframe = motion_started or (motion and scheduler.due(now))
+                    
+                    # Deferred, unknown and stale tracks are retried slowly while nothing moves
+                    if (not keyframe and now - last_keyframe >= still_keyframe_interval
+                            and tracker.needs_encoding(now)):
+                        keyframe, regions = True, None
                 else:
-                    recognized_faces = []
-            
-            # Draw face boxes and labels
-            frame = self.draw_face_boxes(frame, recognized_faces)
-            
-            # Add instructions
-            cv2.putText(frame, "Face Recognition Mode - Press 'q' to quit", 
-                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            cv2.putText(frame, f"Students registered: {len(self.known_encodings)}", 
-                       (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-            
-            # Clear recently marked every 300 frames (about 10 seconds at 30fps)
-            if frame_count % 300 == 0:
-                recently_marked.clear()
-            
-            cv2.imshow('Smart Attendance - Face Recognition', frame)
-            
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('r'):
-                print("Refreshing student data...")
-                self.refresh_data()
-                recently_marked.clear()
-            
-            frame_count += 1
+                    regions = None
+                    keyframe = scheduler.due(now)
+                
+                if keyframe:
+                    last_keyframe = now
+                    scheduler.started(now)
+                    with profiler.stage('cvtColor'):
+                        rgb_frame = convert_color(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+                    to_encode = tracker.update(self.detect_faces(rgb_frame, regions), regions=regions)
+                    
+                    # Encoding may finish on a later frame when a worker pool is used
+                    if to_encode:
+                        locations = [track.location for track in to_encode]
+                        future = self.submit_identification(rgb_frame, locations, self.camera_config.camera_id)
+                        pending.append((to_encode, now, future))
+                    else:
+                        scheduler.record(time.monotonic() - now)
+                
+                # Apply identities and mark attendance for finished encodings
+                for item in [item for item in pending if item[2].done()]:
+                    pending.remove(item)
+                    tracks, started_at, future = item
+                    scheduler.record(time.monotonic() - started_at)
+                    try:
+                        identified = future.result()
+                    except Exception as e:
+                        # The tracks are encoded again on a later keyframe
+                        print(f"⚠ Face encoding failed: {e}")
+                        for track in tracks:
+                            track.defer()
+                        continue
+                    for track, face in zip(tracks, identified):
+                        # Poor crops are retried on the next keyframe instead of being cached as unknown
+                        if 'quality' in face:
+                            track.defer()
+                        else:
+                            track.set_identity(face['student_id'], face['name'], face['confidence'])
+                    
+                    self.mark_recognized(identified, recently_marked)
+                
+                recognized_faces = tracker.faces()
+                
+                # Draw face boxes and labels
+                with profiler.stage('draw'):
+                    frame = self.draw_face_boxes(frame, recognized_faces)
+                    frame = profiler.draw_overlay(frame)
+                
+                # Add instructions
+                cv2.putText(frame, "Face Recognition Mode - Press 'q' to quit", 
+                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                cv2.putText(frame, f"Students registered: {len(self.known_ids)}", 
+                           (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+                
+                # Clear recently marked every dedup_window seconds
+                if now - window_started >= dedup_window:
+                    recently_marked.clear()
+                    window_started = now
+                
+                with profiler.stage('imshow'):
+                    cv2.imshow('Smart Attendance - Face Recognition', frame)
+                    key = cv2.waitKey(1) & 0xFF
+                
+                profiler.maybe_log()
+                
+                if key == ord('q'):
+                    break
+                elif key == ord('r'):
+                    print("Refreshing student data...")
+                    self.refresh_data()
+                    tracker.reset()
+                    recently_marked.clear()
+                elif key == ord('p'):
+                    profiler.toggle_overlay()
+        finally:
+            self.close_encoding_pool()
+            camera_service.release(capture)
+            cv2.destroyAllWindows()
         
-        cap.release()
-        cv2.destroyAllWindows()
+        print(scheduler.summary())
+        print(f"Encoded {tracker.encode_requests} of {tracker.detections} detected faces")
+        if self.quality_gate is not None:
+            print(self.quality_gate.summary())
+        if self.encoding_cache is not None:
+            print(self.encoding_cache.summary())
+        if self.roster_matches or self.roster_fallbacks:
+            print(f"Matched {self.roster_matches} faces on the course roster, "
+                  f"{self.roster_fallbacks} against the full gallery")
+        if motion_gate is not None:
+            print(f"Skipped recognition on {motion_gate.quiet_frames} of {motion_gate.frames} motionless frames")
         return True, "Face recognition mode ended"
     
+    def start_pipelined_recognition_mode(self, workers=2, source=0):
+        """Start face recognition with capture, recognition and rendering on separate threads"""
+        pipeline = RecognitionPipeline(self, source=source, workers=workers)
+        return pipeline.run()
+    
     def detect_faces_simple(self, frame):
         """Simple face detection using Haar cascades (faster alternative)"""
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
@@ -0,0 +1,173 @@
+import time
+import cv2
+import numpy as np
+from face_geometry import location_iou
+
+
+class FaceTrack:
+    """A face followed across frames together with its cached identity"""
+
+    def __init__(self, track_id, location):
+        self.track_id = track_id
+        self.location = location
+        self.student_id = None
+        self.name = "Unknown"
+        self.confidence = 0
+        self.verified_at = None
+        self.pending = False
+        self.missed = 0
+
+    def set_identity(self, student_id, name, confidence, now=None):
+        """Cache the result of encoding and matching this track"""
+        self.student_id = student_id
+        self.name = name
+        self.confidence = confidence
+        self.verified_at = now if now is not None else time.monotonic()
+        self.pending = False
+    
+    def defer(self):
+        """Leave the track unverified so it is encoded again on the next keyframe"""
+        self.pending = False
+
+    def as_face(self):
+        """Return the track in the recognize_faces() result format"""
+        return {
+            'student_id': self.student_id,
+            'name': self.name,
+            'location': self.location,
+            'confidence': self.confidence,
+            'track_id': self.track_id
+        }
+
+
+class FaceTracker:
+    """IoU tracker that carries identities between detection keyframes
+
+    Boxes are moved with sparse optical flow on every frame and re-associated
+    with fresh detections on keyframes. Only new tracks, and tracks whose
+    identity is older than reverify_after seconds, need to be encoded again.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=2, reverify_after=5.0, flow_grid=4):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.reverify_after = reverify_after
+        self.flow_grid = flow_grid
+        self.tracks = []
+        self.next_track_id = 0
+        self.prev_gray = None
+
+        # Counters for judging how much encoding work the tracker saves
+        self.detections = 0
+        self.encode_requests = 0
+
+    def reset(self):
+        """Forget all tracks, e.g. after the gallery changed"""
+        self.tracks = []
+        self.prev_gray = None
+
+    def grid_points(self, location):
+        """Evenly spaced points inside a box for optical flow"""
+        top, right, bottom, left = location
+        xs = np.linspace(left, right, self.flow_grid + 2)[1:-1]
+        ys = np.linspace(top, bottom, self.flow_grid + 2)[1:-1]
+        return np.array([(x, y) for y in ys for x in xs], dtype=np.float32)
+
+    def predict(self, gray):
+        """Shift every track by the median optical flow inside its box"""
+        if self.prev_gray is not None and self.tracks and self.prev_gray.shape == gray.shape:
+            points = np.vstack([self.grid_points(track.location) for track in self.tracks]).reshape(-1, 1, 2)
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(
+                self.prev_gray, gray, points, None, winSize=(15, 15), maxLevel=2
+            )
+
+            height, width = gray.shape[:2]
+            per_track = self.flow_grid * self.flow_grid
+            for i, track in enumerate(self.tracks):
+                window = slice(i * per_track, (i + 1) * per_track)
+                good = status[window, 0] == 1
+                if not good.any():
+                    continue
+
+                shift = np.median((moved[window, 0] - points[window, 0])[good], axis=0)
+                dx, dy = int(round(shift[0])), int(round(shift[1]))
+                top, right, bottom, left = track.location
+                if 0 <= left + dx and right + dx <= width and 0 <= top + dy and bottom + dy <= height:
+                    track.location = (top + dy, right + dx, bottom + dy, left + dx)
+
+        self.prev_gray = gray
+
+    def update(self, face_locations, now=None, regions=None):
+        """Associate keyframe detections with tracks
+
+        Returns the tracks that need encoding: new tracks, tracks still without
+        an identity (e.g. deferred for a poor crop) and tracks due for
+        re-verification. Returned tracks stay pending, and are not returned
+        again, until set_identity() or defer() is called. Tracks unmatched for more than max_missed keyframes
+        are dropped. When detection only ran inside regions, tracks outside
+        all of them were not searched for and are kept as they are.
+        """
+        now = now if now is not None else time.monotonic()
+        self.detections += len(face_locations)
+
+        # Greedy matching on IoU, best pairs first
+        pairs = []
+        for t, track in enumerate(self.tracks):
+            for d, location in enumerate(face_locations):
+                iou = location_iou(track.location, location)
+                if iou >= self.iou_threshold:
+                    pairs.append((iou, t, d))
+        pairs.sort(reverse=True)
+
+        matched_tracks = set()
+        matched_detections = set()
+        for _, t, d in pairs:
+            if self.tracks[t] in matched_tracks or d in matched_detections:
+                continue
+            matched_tracks.add(self.tracks[t])
+            matched_detections.add(d)
+            self.tracks[t].location = face_locations[d]
+            self.tracks[t].missed = 0
+
+        survivors = []
+        for track in self.tracks:
+            searched = regions is None or any(location_iou(track.location, region) > 0 for region in regions)
+            if track not in matched_tracks and searched:
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    continue
+            survivors.append(track)
+        self.tracks = survivors
+
+        to_encode = []
+        for d, location in enumerate(face_locations):
+            if d not in matched_detections:
+                track = FaceTrack(self.next_track_id, location)
+                self.next_track_id += 1
+                self.tracks.append(track)
+                to_encode.append(track)
+
+        for track in matched_tracks:
+            if not track.pending and (track.verified_at is None or now - track.verified_at >= self.reverify_after):
+                to_encode.append(track)
+
+        for track in to_encode:
+            track.pending = True
+        self.encode_requests += len(to_encode)
+        return to_encode
+
+    def needs_encoding(self, now=None):
+        """Whether a keyframe would encode anything, by the same test update() applies
+        
+        Unknown faces count once they were tried, like known ones: until
+        reverify_after has passed there is nothing new to learn from them.
+        """
+        now = now if now is not None else time.monotonic()
+        return any(
+            not track.pending and (track.verified_at is None or now - track.verified_at >= self.reverify_after)
+            for track in self.tracks
+        )
+
+    def faces(self):
+        """Current tracks in the recognize_faces() result format"""
+        return [track.as_face() for track in self.tracks]
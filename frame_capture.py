@@ -0,0 +1,242 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+
+def convert_color(frame, code, dst=None):
+    """cv2.cvtColor into dst when it has the right size, otherwise into a new array"""
+    if dst is not None and dst.shape[:2] == frame.shape[:2]:
+        return cv2.cvtColor(frame, code, dst=dst)
+    return cv2.cvtColor(frame, code)
+
+
+class LatestFrameCapture:
+    """Background capture thread that only ever holds the newest frame
+
+    Frames are decoded and mirrored into two preallocated buffers that swap
+    roles on every frame, so capturing allocates nothing. Any number of
+    consumers can read the latest frame; read() copies it out under the lock,
+    into the caller's own buffer when one is given.
+
+    Frames that are overwritten before anyone read them are counted as
+    dropped, so slow consumers never see a stale backlog.
+
+    Video files would otherwise be decoded as fast as the CPU allows and be
+    over in seconds, with almost every frame dropped; they are played back
+    at their own frame rate instead, like a camera (pace=None decides by
+    source, True or False forces it).
+    """
+
+    def __init__(self, source=0, flip=True, width=None, height=None, fps=None, fourcc='MJPG', buffer_size=1,
+                 pace=None):
+        self.source = source
+        self.flip = flip
+        self.cap = cv2.VideoCapture(source)
+        self.condition = threading.Condition()
+        self.frame = None
+        self.frame_id = 0
+        self.timestamp = None
+        self.consumed = True
+        self.running = False
+        self.thread = None
+
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self.open_seconds = 0.0
+
+        self.frame_interval = None
+        if self.cap.isOpened():
+            self.configure(width, height, fps, fourcc, buffer_size)
+            if pace or (pace is None and isinstance(source, str) and os.path.isfile(source)):
+                self.frame_interval = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+
+    def configure(self, width=None, height=None, fps=None, fourcc='MJPG', buffer_size=1):
+        """Apply capture settings; drivers ignore the ones they do not support"""
+        # Compressed transfer lets USB webcams deliver full resolution at full frame rate
+        if fourcc and isinstance(self.source, int):
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        """Start the capture thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self.capture_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def capture_loop(self):
+        raw = None
+        back = None
+        next_frame_at = time.monotonic()
+
+        while self.running:
+            if self.frame_interval:
+                delay = next_frame_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                # Do not race to catch up after a stall
+                next_frame_at = max(next_frame_at, time.monotonic() - self.frame_interval) + self.frame_interval
+
+            ret, raw = self.cap.read(raw)
+            if not ret:
+                break
+
+            if self.flip:
+                if back is None or back.shape != raw.shape:
+                    back = np.empty_like(raw)
+                cv2.flip(raw, 1, dst=back)
+            else:
+                back = raw
+
+            with self.condition:
+                if not self.consumed:
+                    self.dropped_frames += 1
+                # The previous front buffer becomes the next write target
+                self.frame, back = back, self.frame
+                if not self.flip:
+                    raw = back
+                self.frame_id += 1
+                self.timestamp = time.monotonic()
+                self.consumed = False
+                self.captured_frames += 1
+                self.condition.notify_all()
+
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def read(self, last_frame_id=0, timeout=1.0, out=None):
+        """Wait for a frame newer than last_frame_id
+
+        Returns (frame_id, frame, timestamp), or (last_frame_id, None, None)
+        if the capture stopped or timed out. The frame is copied into out when
+        it has the right shape (pass the previously returned frame to reuse
+        it), otherwise into a new array.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.frame_id > last_frame_id or not self.running, timeout)
+            if self.frame_id <= last_frame_id:
+                return last_frame_id, None, None
+            self.consumed = True
+
+            if out is not None and out.shape == self.frame.shape:
+                np.copyto(out, self.frame)
+            else:
+                out = self.frame.copy()
+            return self.frame_id, out, self.timestamp
+
+    def stop(self):
+        """Stop the capture thread and release the device"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+        self.cap.release()
+
+
+class CameraService:
+    """Owns the capture devices shared by every mode
+
+    acquire() hands out the running capture of a source, opening it on first
+    use; concurrent users of the same source share one device and frame
+    stream. After the last user releases it the device stays open for
+    linger seconds, so switching between modes does not pay for camera
+    initialisation again. Settings only apply when the device is opened.
+    """
+
+    def __init__(self, linger=30.0):
+        self.linger = linger
+        self.lock = threading.Lock()
+        self.captures = {}
+        self.users = {}
+        self.close_timers = {}
+
+    def acquire(self, source=0, flip=None, **settings):
+        """Return a started LatestFrameCapture for source (check is_opened())"""
+        with self.lock:
+            timer = self.close_timers.pop(source, None)
+            if timer is not None:
+                timer.cancel()
+
+            capture = self.captures.get(source)
+            if capture is not None and not capture.running:
+                # End of a file or a disconnected device
+                capture.stop()
+                capture = None
+
+            if capture is None:
+                started = time.perf_counter()
+                # Mirror local webcams, not room cameras or recordings
+                capture = LatestFrameCapture(source, flip=isinstance(source, int) if flip is None else flip,
+                                             **settings)
+                if not capture.is_opened():
+                    capture.cap.release()
+                    return capture
+                capture.open_seconds = time.perf_counter() - started
+                capture.start()
+                self.captures[source] = capture
+                self.users[source] = 0
+
+            self.users[source] += 1
+            return capture
+
+    def release(self, capture):
+        """Give back a capture returned by acquire()"""
+        with self.lock:
+            source = capture.source
+            if self.captures.get(source) is not capture:
+                unused = True
+            else:
+                self.users[source] -= 1
+                if self.users[source] > 0:
+                    return
+                unused = False
+
+                if self.linger > 0 and capture.running:
+                    timer = threading.Timer(self.linger, self.close, args=(source, capture))
+                    timer.daemon = True
+                    self.close_timers[source] = timer
+                    timer.start()
+                    return
+
+        if unused:
+            capture.stop()
+        else:
+            self.close(source, capture)
+
+    def close(self, source, capture):
+        """Close an unused device"""
+        with self.lock:
+            if self.captures.get(source) is not capture or self.users[source] > 0:
+                return
+            del self.captures[source]
+            del self.users[source]
+            self.close_timers.pop(source, None)
+        capture.stop()
+
+    def close_all(self):
+        """Close every device, e.g. when the application exits"""
+        with self.lock:
+            captures = list(self.captures.values())
+            for timer in self.close_timers.values():
+                timer.cancel()
+            self.captures.clear()
+            self.users.clear()
+            self.close_timers.clear()
+        for capture in captures:
+            capture.stop()
+
+
+# Shared by all modes of the application
+camera_service = CameraService()
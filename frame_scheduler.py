@@ -0,0 +1,101 @@
+import os
+import time
+
+
+class AdaptiveScheduler:
+    """Decides how often to run recognition from its measured cost and CPU load
+
+    Recognition (detection plus encoding) runs at most once per interval.
+    The interval is adjusted every adjust_interval seconds:
+
+    - while CPU use is above cpu_target it backs off by 25%
+    - otherwise it shrinks by 20% towards min_interval to use the headroom,
+      but is kept short enough that interval + recognition time stays within
+      latency_budget
+    - it never drops below the recognition time itself, so work cannot pile up
+
+    CPU use is the larger of this process's share of all cores and the
+    1-minute load average per core (where available). Decisions are printed
+    when the interval changes.
+    """
+
+    def __init__(self, latency_budget=0.5, min_interval=0.05, max_interval=2.0, cpu_target=0.75,
+                 adjust_interval=1.0, smoothing=0.2):
+        self.latency_budget = latency_budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.cpu_target = cpu_target
+        self.adjust_interval = adjust_interval
+        self.smoothing = smoothing
+        self.cores = os.cpu_count() or 1
+
+        self.interval = min(max_interval, max(min_interval, latency_budget / 2))
+        self.cost = None
+        self.cpu = 0.0
+        self.last_run = None
+        self.last_adjust = time.monotonic()
+        self.last_cpu_time = time.process_time()
+
+        self.runs = 0
+        self.adjustments = 0
+
+    def due(self, now=None):
+        """Whether recognition should run on this frame"""
+        now = now if now is not None else time.monotonic()
+        if now - self.last_adjust >= self.adjust_interval:
+            self.adjust(now)
+        return self.last_run is None or now - self.last_run >= self.interval
+
+    def started(self, now=None):
+        """Note that recognition started on this frame"""
+        self.last_run = now if now is not None else time.monotonic()
+        self.runs += 1
+
+    def record(self, seconds):
+        """Feed the time one recognition took, from frame to identities"""
+        if self.cost is None:
+            self.cost = seconds
+        else:
+            self.cost += self.smoothing * (seconds - self.cost)
+
+    def measure_cpu(self, now):
+        """Fraction of the machine's CPU in use since the last measurement"""
+        cpu_time = time.process_time()
+        elapsed = now - self.last_adjust
+        usage = (cpu_time - self.last_cpu_time) / (elapsed * self.cores) if elapsed > 0 else 0.0
+        self.last_cpu_time = cpu_time
+
+        if hasattr(os, 'getloadavg'):
+            usage = max(usage, os.getloadavg()[0] / self.cores)
+        return min(1.0, usage)
+
+    def adjust(self, now):
+        self.cpu = self.measure_cpu(now)
+        self.last_adjust = now
+        if self.cost is None:
+            return
+
+        previous = self.interval
+        if self.cpu > self.cpu_target:
+            interval = previous * 1.25
+            reason = f"cpu {self.cpu:.0%} above {self.cpu_target:.0%}"
+            if interval + self.cost > self.latency_budget:
+                reason += f", over {self.latency_budget * 1000:.0f}ms latency budget"
+        else:
+            # Jump back within the latency budget at once, then keep using the headroom
+            interval = min(previous * 0.8, self.latency_budget - self.cost)
+            reason = f"cpu {self.cpu:.0%}, headroom available"
+
+        lower = max(self.min_interval, self.cost)
+        self.interval = min(self.max_interval, max(lower, interval))
+
+        if abs(self.interval - previous) > 0.05 * previous:
+            self.adjustments += 1
+            print(f"[scheduler] interval {previous * 1000:.0f}ms -> {self.interval * 1000:.0f}ms "
+                  f"({reason}, recognition {self.cost * 1000:.0f}ms)")
+
+    def summary(self):
+        """Counters as a short printable string"""
+        cost = f"{self.cost * 1000:.0f}ms" if self.cost is not None else "-"
+        return (f"Recognition ran {self.runs} times, final interval {self.interval * 1000:.0f}ms, "
+                f"recognition {cost}, {self.adjustments} adjustments")
@@ -0,0 +1,173 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from frame_capture import camera_service, convert_color
+from hand_tracker import HandTracker
+
+
+class FusedAttendance:
+    """Raise a hand, get recognized: gesture-triggered face identification
+
+    MediaPipe hand detection runs on every frame. Only when a hand is
+    confirmed raised is the face module asked to detect and encode faces,
+    and only in the region around that hand where the raiser's head is.
+    The face closest to the hand is identified on a background thread and
+    marked present. When no known face is found there, the raised hand falls
+    back to a pending check-in that waits for a typed or scanned ID.
+    """
+
+    def __init__(self, gesture_module, face_module, required_frames=15, min_confidence=0.5):
+        self.gesture_module = gesture_module
+        self.face_module = face_module
+        self.min_confidence = min_confidence
+        self.required_frames = required_frames
+        self.pending = []
+
+        self.events = 0
+        self.identified = 0
+        self.fallbacks = 0
+        self.unfinished = 0
+
+    def face_region(self, box, frame_shape):
+        """Region to search for the raiser's face, as (top, right, bottom, left)
+
+        A raised hand is level with or above the head and off to one side, so
+        the region spans a few hand widths either side and reaches from just
+        above the hand to well below it.
+        """
+        height, width = frame_shape[:2]
+        x_min, y_min, x_max, y_max = box
+        hand_width, hand_height = x_max - x_min, y_max - y_min
+        center_x = (x_min + x_max) // 2
+        return (
+            max(0, y_min - hand_height // 2),
+            min(width, center_x + 3 * hand_width),
+            min(height, y_max + 3 * hand_height),
+            max(0, center_x - 3 * hand_width),
+        )
+
+    def identify_raiser(self, rgb_frame, box):
+        """Face of the person raising the hand at box, or None if no face was found"""
+        region = self.face_region(box, rgb_frame.shape)
+        face_locations = self.face_module.detect_faces(rgb_frame, regions=[region])
+        if not face_locations:
+            return None
+
+        # The raiser's face is the one horizontally closest to the hand
+        hand_x = (box[0] + box[2]) / 2
+        location = min(face_locations, key=lambda loc: abs((loc[1] + loc[3]) / 2 - hand_x))
+        return self.face_module.identify_faces(rgb_frame, [location], self.face_module.camera_config.camera_id)[0]
+
+    def handle_result(self, box, face, fallback=True):
+        """Mark an identified raiser present, or fall back to asking for an ID
+        
+        Without fallback an unidentified raiser is only counted, for when
+        nobody is left to type an ID.
+        """
+        if face and face['student_id'] and face['confidence'] > self.min_confidence:
+            self.identified += 1
+            success, message = self.face_module.attendance_mgr.mark_attendance(
+                face['student_id'], face['name'], "Gesture + Face"
+            )
+            print(f"{'✓' if success else '⚠'} {message}")
+            return
+
+        if not fallback:
+            self.unfinished += 1
+            return
+
+        self.fallbacks += 1
+        checkin = self.gesture_module.checkins.add(box)
+        if checkin:
+            print(f"Raised hand #{checkin.checkin_id} not recognized, waiting for a student ID")
+
+    def run(self, id_sources=('stdin',), socket_port=9465, window_name='Smart Attendance - Gesture + Face'):
+        """Run until 'q' is pressed"""
+        self.gesture_module.estimator.reset()
+        # Hands and identifications from an earlier run belong to that run
+        tracker = HandTracker(required_frames=self.required_frames)
+        self.pending = []
+        capture = camera_service.acquire(0)
+        if not capture.is_opened():
+            return False, "Could not access camera"
+
+        print("Gesture + Face Mode Started")
+        print("Raise your hand to be recognized and marked present")
+        print("Press 'q' to quit, 'p' to toggle performance overlay")
+        self.gesture_module.start_id_sources(id_sources, socket_port)
+
+        profiler = self.gesture_module.profiler
+        executor = ThreadPoolExecutor(max_workers=1)
+        frame_id, frame, rgb_frame = 0, None, None
+
+        while True:
+            with profiler.stage('capture'):
+                frame_id, new_frame, _ = capture.read(frame_id, out=frame)
+            if new_frame is None:
+                if not capture.running:
+                    break
+                continue
+            frame = new_frame
+
+            hands, raised = self.gesture_module.detect_hands(frame)
+            with profiler.stage('hand_tracking'):
+                confirmed = tracker.update(hands, raised, frame.shape)
+
+            # Face work only happens on check-in events, off the video thread
+            if confirmed:
+                rgb_frame = convert_color(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+                for track in confirmed:
+                    self.events += 1
+                    future = executor.submit(self.identify_raiser, rgb_frame.copy(), track.box)
+                    self.pending.append((track.box, future))
+
+            for box, future in [item for item in self.pending if item[1].done()]:
+                self.pending.remove((box, future))
+                try:
+                    face = future.result()
+                except Exception as e:
+                    print(f"⚠ Face identification failed: {e}")
+                    face = None
+                self.handle_result(box, face)
+
+            with profiler.stage('draw'):
+                frame = self.gesture_module.draw_hand_landmarks(frame, hands)
+                frame = self.gesture_module.draw_hand_tracks(frame, tracker)
+                frame = profiler.draw_overlay(frame, origin=(10, 130))
+
+            cv2.putText(frame, "Gesture + Face Mode - Raise hand to check in",
+                       (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            cv2.putText(frame, f"Press 'q' to quit - identifying: {len(self.pending)}  "
+                              f"waiting for ID: {len(self.gesture_module.checkins.pending())}",
+                       (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+            with profiler.stage('imshow'):
+                cv2.imshow(window_name, frame)
+                key = cv2.waitKey(1) & 0xFF
+
+            profiler.maybe_log()
+
+            if key == ord('q'):
+                break
+            elif key == ord('p'):
+                profiler.toggle_overlay()
+
+        camera_service.release(capture)
+        cv2.destroyAllWindows()
+
+        # Let identifications already started finish and be marked; the ID
+        # prompt is gone by now, so the rest are only counted
+        deadline = time.monotonic() + 5.0
+        for box, future in self.pending:
+            try:
+                face = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                face = None
+            self.handle_result(box, face, fallback=False)
+        self.pending = []
+        executor.shutdown(wait=False)
+
+        print(self.gesture_module.estimator.summary())
+        print(f"Raised hands: {self.events}, recognized by face: {self.identified}, "
+              f"asked for an ID: {self.fallbacks}, unidentified at shutdown: {self.unfinished}")
+        return True, "Gesture + face mode ended"
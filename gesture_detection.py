@@ -2,194 +2,235 @@ import cv2
 import mediapipe as mp
 import numpy as np
 from attendance_manager import AttendanceManager
+from checkin_queue import CheckInQueue, serve_id_socket, start_stdin_reader
 from student_registration import StudentRegistration
-import tkinter as tk
-from tkinter import simpledialog
+from frame_capture import camera_service
+from hand_geometry import landmarks_to_array, raised_hand_mask
+from hand_inference import HandLandmarkEstimator
+from hand_tracker import HandTracker
+from profiling import StageProfiler
 
 class GestureDetection:
-    def __init__(self):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
+    def __init__(self, max_num_hands=2, inference_width=None, inference_stride=1, roi_tracking=False):
+        # Per-stage timings for the overlay, log lines and Prometheus metrics
+        self.profiler = StageProfiler('gesture')
+        
+        # Smaller, fewer and cropped MediaPipe inputs for slow or shared CPUs
+        self.estimator = HandLandmarkEstimator(
+            max_num_hands=max_num_hands,
+            inference_width=inference_width,
+            stride=inference_stride,
+            roi=roi_tracking,
+            profiler=self.profiler
         )
-        self.mp_draw = mp.solutions.drawing_utils
+        # Hand skeleton as pairs of landmark indices, for drawing
+        self.hand_connections = np.array(sorted(mp.solutions.hands.HAND_CONNECTIONS))
         self.attendance_mgr = AttendanceManager()
         self.student_reg = StudentRegistration()
         
+        # Confirmed gestures wait here for a student ID while the video keeps running
+        self.checkins = CheckInQueue(self.check_in_student, validate=self.student_reg.get_student_by_id)
+        self.stdin_reader = None
+        self.id_server = None
+        
+    def warm_up(self):
+        """Initialize MediaPipe ahead of the first frame, e.g. from a background thread"""
+        self.estimator.warm_up()
+    
     def is_hand_raised(self, landmarks):
-        """Check if hand is raised (palm facing camera, fingers up)"""
+        """Check if hand is raised (palm facing camera, fingers up)
+        
+        The hand is raised if at least 3 fingers are extended (tips above their
+        lower joints) and the index finger tip is above the wrist.
+        """
         if not landmarks:
             return False
         
-        # Get landmark positions
-        wrist = landmarks[0]
-        thumb_tip = landmarks[4]
-        index_tip = landmarks[8]
-        middle_tip = landmarks[12]
-        ring_tip = landmarks[16]
-        pinky_tip = landmarks[20]
-        
-        # Check if fingers are extended (tips above their respective MCP joints)
-        thumb_extended = thumb_tip.y < landmarks[3].y
-        index_extended = index_tip.y < landmarks[6].y
-        middle_extended = middle_tip.y < landmarks[10].y
-        ring_extended = ring_tip.y < landmarks[14].y
-        pinky_extended = pinky_tip.y < landmarks[18].y
-        
-        # Hand is raised if at least 3 fingers are extended and hand is above wrist level
-        fingers_up = sum([thumb_extended, index_extended, middle_extended, ring_extended, pinky_extended])
-        hand_raised = fingers_up >= 3 and index_tip.y < wrist.y
-        
-        return hand_raised
+        return bool(raised_hand_mask(landmarks_to_array([landmarks]))[0])
+    
+    def detect_hands(self, frame):
+        """Find hands in a BGR frame
+        
+        Returns (hands, raised): hands is a (hands, 21, 3) array of landmarks
+        normalized to the frame (see hand_geometry), raised a bool mask over
+        the hands. Between MediaPipe inference frames the landmarks are
+        predicted from the previous ones.
+        """
+        hands, _ = self.estimator.estimate(frame)
+        
+        with self.profiler.stage('is_hand_raised'):
+            raised = raised_hand_mask(hands)
+        
+        return hands, raised
     
     def detect_raised_hand(self, frame):
-        """Detect raised hand gesture in frame"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb_frame)
+        """Detect raised hand gesture in frame
         
-        raised_hands = []
+        Returns (raised hand landmarks, MediaPipe results) as before the
+        estimator existed: MediaPipe runs on the whole frame whatever the
+        stride and ROI settings. Modes use detect_hands() instead.
+        """
+        results = self.estimator.process(frame)
         
+        raised_hands = []
         if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                if self.is_hand_raised(hand_landmarks.landmark):
-                    raised_hands.append(hand_landmarks)
+            with self.profiler.stage('is_hand_raised'):
+                raised = raised_hand_mask(landmarks_to_array(results.multi_hand_landmarks))
+            raised_hands = [landmarks for landmarks, up in zip(results.multi_hand_landmarks, raised) if up]
         
         return raised_hands, results
     
-    def draw_hand_landmarks(self, frame, results):
-        """Draw hand landmarks on frame"""
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                self.mp_draw.draw_landmarks(
-                    frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS
-                )
+    def draw_hand_landmarks(self, frame, hands):
+        """Draw the skeleton of every hand on frame
+        
+        hands is a landmark array from detect_hands() or the MediaPipe
+        results from detect_raised_hand().
+        """
+        if not isinstance(hands, np.ndarray):
+            hands = landmarks_to_array(hands.multi_hand_landmarks)
+        if len(hands) == 0:
+            return frame
+        
+        height, width = frame.shape[:2]
+        points = (hands[:, :, :2] * np.array([width, height], dtype=np.float32)).astype(np.int32)
+        segments = points[:, self.hand_connections].reshape(-1, 2, 2)
+        cv2.polylines(frame, list(segments), False, (224, 224, 224), 2)
+        for x, y in points.reshape(-1, 2):
+            cv2.circle(frame, (int(x), int(y)), 2, (0, 0, 255), 2)
         return frame
     
-    def get_student_id_input(self):
-        """Get student ID input from user"""
-        root = tk.Tk()
-        root.withdraw()  # Hide the main window
-        
-        student_id = simpledialog.askstring(
-            "Student ID", 
-            "Hand gesture detected!\nEnter your Student ID:",
-            parent=root
-        )
-        
-        root.destroy()
-        return student_id
+    def draw_hand_tracks(self, frame, tracker):
+        """Draw a box and confirmation progress for every hand being raised"""
+        for track in tracker.tracks:
+            if track.missed or not track.raised_frames:
+                continue
+            x_min, y_min, x_max, y_max = track.box
+            color = (0, 255, 0) if track.raised else (0, 200, 255)
+            cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), color, 3)
+            label = "Confirmed" if track.confirmed else f"{track.raised_frames}/{tracker.required_frames}"
+            cv2.putText(frame, label, (x_min, max(15, y_min - 8)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        return frame
+    
+    def check_in_student(self, student_id):
+        """Mark attendance for the student ID given for a raised hand"""
+        student = self.student_reg.get_student_by_id(student_id)
+        if not student:
+            return False, f"Student ID {student_id} not found"
+        
+        with self.profiler.stage('mark_attendance'):
+            return self.attendance_mgr.mark_attendance(student_id, student['name'], "Gesture Detection")
     
-    def start_gesture_detection_mode(self):
-        """Start gesture detection attendance mode"""
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+    def start_id_sources(self, id_sources, socket_port=9465):
+        """Start the requested student ID inputs: 'stdin', 'socket' and/or 'tk'
+        
+        'tk' needs nothing here; the main app polls self.checkins itself.
+        """
+        if 'stdin' in id_sources and self.stdin_reader is None:
+            # Blocking reads cannot be interrupted, so one reader serves every run
+            self.stdin_reader = start_stdin_reader(self.checkins)
+            print("Type or scan a student ID and press Enter to answer a raised hand")
+        if 'socket' in id_sources and self.id_server is None:
+            self.id_server = serve_id_socket(self.checkins, socket_port)
+            print(f"Accepting student IDs on 127.0.0.1:{socket_port}")
+    
+    def start_gesture_detection_mode(self, id_sources=('stdin',), socket_port=9465):
+        """Start gesture detection attendance mode
+        
+        Confirmed raised hands are queued as pending check-ins; student IDs
+        arrive from id_sources without pausing the video.
+        """
+        # Landmarks left over from a previous run must not be extrapolated into this one
+        self.estimator.reset()
+        capture = camera_service.acquire(0)
+        if not capture.is_opened():
             return False, "Could not access camera"
         
         print("Gesture Detection Mode Started")
         print("Raise your hand to mark attendance")
-        print("Press 'q' to quit")
+        print("Press 'q' to quit, 'p' to toggle performance overlay")
+        self.start_id_sources(id_sources, socket_port)
         
-        gesture_detected = False
-        gesture_frames = 0
-        required_frames = 15  # Require gesture for 15 consecutive frames
+        # Every hand confirms on its own after 15 raised frames
+        tracker = HandTracker(required_frames=15)
+        profiler = self.profiler
+        frame_id, frame = 0, None
         
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Flip frame horizontally for mirror effect
-            frame = cv2.flip(frame, 1)
+            # The service delivers frames already mirrored, copied into the previous frame's buffer
+            with profiler.stage('capture'):
+                frame_id, new_frame, _ = capture.read(frame_id, out=frame)
+            if new_frame is None:
+                if not capture.running:
+                    break
+                continue
+            frame = new_frame
             
             # Detect raised hands
-            raised_hands, results = self.detect_raised_hand(frame)
+            hands, raised = self.detect_hands(frame)
             
             # Draw hand landmarks
-            frame = self.draw_hand_landmarks(frame, results)
+            with profiler.stage('draw'):
+                frame = self.draw_hand_landmarks(frame, hands)
             
-            # Check for raised hand gesture
-            if raised_hands:
-                gesture_frames += 1
-                cv2.putText(frame, f"Hand Raised! ({gesture_frames}/{required_frames})", 
-                           (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                
-                # Draw bounding box around raised hands
-                for hand_landmarks in raised_hands:
-                    h, w, c = frame.shape
-                    x_coords = [int(lm.x * w) for lm in hand_landmarks.landmark]
-                    y_coords = [int(lm.y * h) for lm in hand_landmarks.landmark]
-                    
-                    x_min, x_max = min(x_coords), max(x_coords)
-                    y_min, y_max = min(y_coords), max(y_coords)
-                    
-                    cv2.rectangle(frame, (x_min-20, y_min-20), (x_max+20, y_max+20), (0, 255, 0), 3)
-                
-                # If gesture detected for required frames, prompt for student ID
-                if gesture_frames >= required_frames and not gesture_detected:
-                    gesture_detected = True
-                    
-                    # Get student ID
-                    student_id = self.get_student_id_input()
-                    
-                    if student_id:
-                        # Get student info
-                        student = self.student_reg.get_student_by_id(student_id)
-                        
-                        if student:
-                            # Mark attendance
-                            success, message = self.attendance_mgr.mark_attendance(
-                                student_id, student['name'], "Gesture Detection"
-                            )
-                            print(f"{'✓' if success else '⚠'} {message}")
-                        else:
-                            print(f"⚠ Student ID {student_id} not found")
-                    else:
-                        print("⚠ No student ID entered")
-                    
-                    # Reset gesture detection
-                    gesture_frames = 0
-                    gesture_detected = False
-            else:
-                gesture_frames = 0
-                gesture_detected = False
+            # Follow each hand and confirm raised ones independently
+            with profiler.stage('hand_tracking'):
+                confirmed = tracker.update(hands, raised, frame.shape)
+            
+            for track in confirmed:
+                checkin = self.checkins.add(track.box)
+                if checkin:
+                    print(f"Raised hand #{checkin.checkin_id} waiting for a student ID")
+                else:
+                    print("⚠ Too many raised hands waiting for a student ID")
+            
+            # Draw bounding box and progress for every hand being raised
+            frame = self.draw_hand_tracks(frame, tracker)
             
             # Add instructions
             cv2.putText(frame, "Gesture Detection Mode - Raise hand to mark attendance", 
                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-            cv2.putText(frame, "Press 'q' to quit", 
+            cv2.putText(frame, f"Press 'q' to quit - waiting for ID: {len(self.checkins.pending())}", 
                        (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            frame = profiler.draw_overlay(frame, origin=(10, 130))
+            
+            with profiler.stage('imshow'):
+                cv2.imshow('Smart Attendance - Gesture Detection', frame)
+                key = cv2.waitKey(1) & 0xFF
             
-            cv2.imshow('Smart Attendance - Gesture Detection', frame)
+            profiler.maybe_log()
             
-            key = cv2.waitKey(1) & 0xFF
             if key == ord('q'):
                 break
+            elif key == ord('p'):
+                profiler.toggle_overlay()
         
-        cap.release()
+        camera_service.release(capture)
         cv2.destroyAllWindows()
+        print(self.estimator.summary())
+        print(self.checkins.summary())
         return True, "Gesture detection mode ended"
     
     def test_gesture_detection(self):
         """Test gesture detection without attendance marking"""
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+        self.estimator.reset()
+        capture = camera_service.acquire(0)
+        if not capture.is_opened():
             return False, "Could not access camera"
         
         print("Testing Gesture Detection - Press 'q' to quit")
+        frame_id, frame = 0, None
         
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            frame = cv2.flip(frame, 1)
-            raised_hands, results = self.detect_raised_hand(frame)
-            frame = self.draw_hand_landmarks(frame, results)
+            frame_id, new_frame, _ = capture.read(frame_id, out=frame)
+            if new_frame is None:
+                if not capture.running:
+                    break
+                continue
+            frame = new_frame
+            hands, raised = self.detect_hands(frame)
+            frame = self.draw_hand_landmarks(frame, hands)
             
-            if raised_hands:
+            if raised.any():
                 cv2.putText(frame, "HAND RAISED DETECTED!", 
                            (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
             
@@ -201,6 +242,6 @@ class GestureDetection:
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
         
-        cap.release()
+        camera_service.release(capture)
         cv2.destroyAllWindows()
         return True, "Gesture test completed"
@@ -0,0 +1,104 @@
+import numpy as np
+
+# MediaPipe Hands landmark indices
+WRIST = 0
+THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP = 4, 8, 12, 16, 20
+FINGER_TIPS = np.array([THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP])
+# Joint below each tip that the tip must be above for the finger to count as extended
+FINGER_JOINTS = np.array([3, 6, 10, 14, 18])
+
+
+# Wire format of one landmark in a serialized NormalizedLandmarkList that holds
+# only x, y and z: field tag, message length 15, then three tagged floats
+LANDMARK_RECORD = np.dtype([
+    ('tag', 'u1'), ('size', 'u1'),
+    ('x_tag', 'u1'), ('x', '<f4'), ('y_tag', 'u1'), ('y', '<f4'), ('z_tag', 'u1'), ('z', '<f4'),
+])
+LANDMARK_TAGS = {'tag': 0x0a, 'size': 0x0f, 'x_tag': 0x0d, 'y_tag': 0x15, 'z_tag': 0x1d}
+
+
+def landmarks_to_array(hand_landmarks):
+    """Convert MediaPipe hand landmarks to a (hands, 21, 3) float32 array of normalized x, y, z
+
+    Accepts results.multi_hand_landmarks (objects with a .landmark list) or
+    plain lists of 21 landmarks. None or an empty list gives shape (0, 21, 3).
+    MediaPipe messages are decoded from their serialized bytes in one NumPy
+    call instead of 63 attribute reads per hand.
+    """
+    if not hand_landmarks:
+        return np.empty((0, 21, 3), dtype=np.float32)
+
+    if hasattr(hand_landmarks[0], 'SerializeToString'):
+        data = b''.join(hand.SerializeToString() for hand in hand_landmarks)
+        if len(data) == len(hand_landmarks) * 21 * LANDMARK_RECORD.itemsize:
+            records = np.frombuffer(data, LANDMARK_RECORD)
+            if all((records[field] == tag).all() for field, tag in LANDMARK_TAGS.items()):
+                return np.stack([records['x'], records['y'], records['z']], axis=1).reshape(-1, 21, 3)
+
+    # Landmarks with visibility/presence set, or plain objects
+    values = [
+        (point.x, point.y, point.z)
+        for hand in hand_landmarks
+        for point in getattr(hand, 'landmark', hand)
+    ]
+    return np.array(values, dtype=np.float32).reshape(-1, 21, 3)
+
+
+def extended_fingers(hands):
+    """(hands, 5) bool array: finger tip above its joint (image y grows downwards)"""
+    return hands[:, FINGER_TIPS, 1] < hands[:, FINGER_JOINTS, 1]
+
+
+def raised_hand_mask(hands, min_fingers=3):
+    """(hands,) bool array: at least min_fingers extended and the index tip above the wrist"""
+    if len(hands) == 0:
+        return np.zeros(0, dtype=bool)
+    fingers_up = extended_fingers(hands).sum(axis=1)
+    return (fingers_up >= min_fingers) & (hands[:, INDEX_TIP, 1] < hands[:, WRIST, 1])
+
+
+def hand_boxes(hands, frame_shape, padding=0):
+    """(hands, 4) int array of pixel boxes as x_min, y_min, x_max, y_max"""
+    height, width = frame_shape[:2]
+    if len(hands) == 0:
+        return np.zeros((0, 4), dtype=int)
+
+    pixels = hands[:, :, :2] * np.array([width, height], dtype=np.float32)
+    boxes = np.concatenate([pixels.min(axis=1) - padding, pixels.max(axis=1) + padding], axis=1)
+    return boxes.astype(int)
+
+
+def hand_centroids(hands):
+    """(hands, 2) array of the mean normalized x, y of each hand's landmarks"""
+    return hands[:, :, :2].mean(axis=1)
+
+
+def hands_region(hands, frame_shape, margin=0.5):
+    """Pixel box x_min, y_min, x_max, y_max around all hands, or None if there are none
+
+    Each side is widened by margin times the size of the largest hand, so a
+    hand moving between frames stays inside, and clipped to the frame.
+    """
+    if len(hands) == 0:
+        return None
+    height, width = frame_shape[:2]
+    boxes = hand_boxes(hands, frame_shape)
+    pad = int(margin * max((boxes[:, 2] - boxes[:, 0]).max(), (boxes[:, 3] - boxes[:, 1]).max()))
+    return (
+        max(0, int(boxes[:, 0].min()) - pad),
+        max(0, int(boxes[:, 1].min()) - pad),
+        min(width, int(boxes[:, 2].max()) + pad),
+        min(height, int(boxes[:, 3].max()) + pad),
+    )
+
+
+def crop_to_frame(hands, box, frame_shape):
+    """Map landmarks normalized to the crop at box back to the full frame, in place"""
+    height, width = frame_shape[:2]
+    x_min, y_min, x_max, y_max = box
+    crop_width, crop_height = x_max - x_min, y_max - y_min
+    hands[:, :, 0] = (hands[:, :, 0] * crop_width + x_min) / width
+    hands[:, :, 1] = (hands[:, :, 1] * crop_height + y_min) / height
+    # z shares the scale of x
+    hands[:, :, 2] *= crop_width / width
+    return hands
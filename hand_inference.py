@@ -0,0 +1,176 @@
+import cv2
+import mediapipe as mp
+import numpy as np
+from frame_capture import convert_color
+from hand_geometry import crop_to_frame, hand_centroids, hands_region, landmarks_to_array
+from profiling import StageProfiler
+
+
+class HandLandmarkEstimator:
+    """MediaPipe Hands run on fewer, smaller images
+
+    Three knobs trade accuracy for CPU, so gesture detection keeps up with the
+    camera on low-power machines or with several cameras on one machine:
+
+    - inference_width: frames wider than this are downscaled before MediaPipe
+      sees them (None keeps full resolution)
+    - stride: MediaPipe runs on every stride-th frame; frames in between get
+      the last landmarks moved along their most recent motion (extrapolate)
+      or held unchanged
+    - roi: once hands are found, only the region around them is processed,
+      with a full-frame pass every full_frame_every inferences (and whenever
+      the region loses a hand) to pick up hands that appear elsewhere
+
+    Landmarks are always returned normalized to the full frame, as a
+    (hands, 21, 3) array (see hand_geometry).
+    """
+
+    def __init__(self, max_num_hands=2, inference_width=None, stride=1, roi=False,
+                 roi_margin=0.5, full_frame_every=10, extrapolate=True,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.5, profiler=None):
+        self.max_num_hands = max_num_hands
+        self.inference_width = inference_width
+        self.stride = max(1, stride)
+        self.roi = roi
+        self.roi_margin = roi_margin
+        self.full_frame_every = full_frame_every
+        self.extrapolate = extrapolate
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.profiler = profiler or StageProfiler('hands')
+
+        self.hands = self.create_hands()
+        # Crops move with the hands, so they get their own tracking state
+        self.roi_hands = self.create_hands() if roi else None
+
+        self.rgb_frame = None
+        self.frame_index = 0
+        self.since_full_frame = 0
+        # Latest inference and the one before it, as (frame_index, hands)
+        self.last = None
+        self.previous = None
+
+        self.frames = 0
+        self.inferences = 0
+        self.roi_inferences = 0
+
+    def create_hands(self):
+        return mp.solutions.hands.Hands(
+            static_image_mode=False,
+            max_num_hands=self.max_num_hands,
+            min_detection_confidence=self.min_detection_confidence,
+            min_tracking_confidence=self.min_tracking_confidence
+        )
+
+    def warm_up(self, frame_shape=(480, 640, 3)):
+        """Run every MediaPipe graph once so the first real frame is not slow"""
+        blank = np.zeros(frame_shape, dtype=np.uint8)
+        for hands_solution in (self.hands, self.roi_hands):
+            if hands_solution is not None:
+                hands_solution.process(blank)
+
+    def reset(self):
+        """Forget previous landmarks, e.g. when switching cameras"""
+        self.frame_index = 0
+        self.since_full_frame = 0
+        self.last = self.previous = None
+
+    def estimate(self, frame):
+        """Landmarks for a BGR frame; returns (hands, inferred)
+
+        inferred is False when the landmarks were predicted from earlier
+        inferences instead of running MediaPipe on this frame.
+        """
+        self.frames += 1
+        self.frame_index += 1
+
+        if self.last is not None and (self.frame_index - self.last[0]) < self.stride:
+            return self.predict(), False
+
+        region = None
+        if self.roi and self.last is not None and self.since_full_frame < self.full_frame_every:
+            region = hands_region(self.last[1], frame.shape, self.roi_margin)
+            # Not worth it when the hands fill most of the frame anyway
+            if region is not None:
+                x_min, y_min, x_max, y_max = region
+                if (x_max - x_min) * (y_max - y_min) > 0.6 * frame.shape[0] * frame.shape[1]:
+                    region = None
+
+        hands = self.infer(frame, region)
+        if region is not None and len(hands) < len(self.last[1]):
+            # A hand left the region or was lost: look at the whole frame now
+            hands = self.infer(frame, None)
+
+        self.previous = self.last
+        self.last = (self.frame_index, hands)
+        return hands.copy(), True
+
+    def process(self, frame):
+        """Raw MediaPipe results for the whole frame, ignoring stride and ROI
+
+        For callers that want MediaPipe's own landmark messages. It counts as
+        an inference, so estimate() carries on from these landmarks.
+        """
+        self.frames += 1
+        self.frame_index += 1
+        results = self.run_mediapipe(frame, None)
+        self.previous = self.last
+        self.last = (self.frame_index, landmarks_to_array(results.multi_hand_landmarks))
+        return results
+
+    def infer(self, frame, region):
+        """Run MediaPipe on the frame, or on the region x_min, y_min, x_max, y_max of it"""
+        results = self.run_mediapipe(frame, region)
+        hands = landmarks_to_array(results.multi_hand_landmarks)
+        if region is not None:
+            hands = crop_to_frame(hands, region, frame.shape)
+        return hands
+
+    def run_mediapipe(self, frame, region):
+        """MediaPipe results for the frame or a region of it, in region coordinates"""
+        if region is None:
+            image, hands_solution = frame, self.hands
+            self.since_full_frame = 0
+        else:
+            x_min, y_min, x_max, y_max = region
+            image, hands_solution = frame[y_min:y_max, x_min:x_max], self.roi_hands
+            self.since_full_frame += 1
+            self.roi_inferences += 1
+        self.inferences += 1
+
+        with self.profiler.stage('cvtColor'):
+            if self.inference_width and image.shape[1] > self.inference_width:
+                scale = self.inference_width / image.shape[1]
+                image = cv2.resize(image, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            self.rgb_frame = convert_color(image, cv2.COLOR_BGR2RGB, dst=self.rgb_frame)
+
+        with self.profiler.stage('hands_process'):
+            return hands_solution.process(self.rgb_frame)
+
+    def predict(self):
+        """Landmarks for a frame between inferences"""
+        last_index, last_hands = self.last
+        if not self.extrapolate or self.previous is None or len(last_hands) == 0:
+            return last_hands.copy()
+
+        previous_index, previous_hands = self.previous
+        if len(previous_hands) != len(last_hands):
+            return last_hands.copy()
+
+        # MediaPipe does not keep hand order, so pair hands by nearest centroid
+        distances = np.linalg.norm(
+            hand_centroids(last_hands)[:, None, :] - hand_centroids(previous_hands)[None, :, :], axis=2
+        )
+        order = distances.argmin(axis=1)
+        if len(set(order.tolist())) != len(order):
+            return last_hands.copy()
+
+        velocity = (last_hands - previous_hands[order]) / (last_index - previous_index)
+        return last_hands + velocity * (self.frame_index - last_index)
+
+    def summary(self):
+        """Counters as a short printable string"""
+        rate = self.inferences / self.frames if self.frames else 0.0
+        return (f"Hand inference: {self.inferences} runs over {self.frames} frames ({rate:.0%}), "
+                f"{self.roi_inferences} on hand regions")
+
@@ -0,0 +1,101 @@
+import numpy as np
+from hand_geometry import hand_boxes, hand_centroids
+
+
+class HandTrack:
+    """One hand followed across frames with its own raised-hand counter"""
+
+    def __init__(self, track_id, centroid):
+        self.track_id = track_id
+        self.centroid = centroid
+        self.box = None
+        self.raised = False
+        self.raised_frames = 0
+        self.confirmed = False
+        self.missed = 0
+
+
+class HandTracker:
+    """Centroid tracker giving every hand its own gesture confirmation
+
+    Hands are matched to tracks by nearest landmark centroid (normalized
+    coordinates). Each track counts frames with its hand raised; a frame
+    without the gesture only takes one step off the count instead of
+    resetting it, and a briefly undetected hand keeps its count. A track
+    confirms once when the count reaches required_frames and can confirm
+    again only after the hand has been lowered.
+    """
+
+    def __init__(self, required_frames=15, max_distance=0.1, max_missed=5):
+        self.required_frames = required_frames
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.tracks = []
+        self.next_track_id = 0
+
+        self.confirmations = 0
+
+    def reset(self):
+        self.tracks = []
+
+    def update(self, hands, raised, frame_shape):
+        """Feed one frame's (hands, 21, 3) landmarks and raised mask
+
+        Returns the tracks confirmed on this frame.
+        """
+        centroids = hand_centroids(hands)
+        boxes = hand_boxes(hands, frame_shape, padding=20)
+
+        # Greedy matching on centroid distance, closest pairs first
+        matched_tracks = set()
+        matched_hands = set()
+        if self.tracks and len(hands):
+            previous = np.array([track.centroid for track in self.tracks])
+            distances = np.linalg.norm(previous[:, None, :] - centroids[None, :, :], axis=2)
+            for t, h in zip(*np.unravel_index(np.argsort(distances, axis=None), distances.shape)):
+                if distances[t, h] > self.max_distance:
+                    break
+                if t in matched_tracks or h in matched_hands:
+                    continue
+                matched_tracks.add(t)
+                matched_hands.add(h)
+                self.tracks[t].centroid = centroids[h]
+                self.tracks[t].box = tuple(boxes[h].tolist())
+                self.tracks[t].raised = bool(raised[h])
+                self.tracks[t].missed = 0
+
+        survivors = []
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.missed += 1
+                track.raised = False
+                if track.missed > self.max_missed:
+                    continue
+            survivors.append(track)
+        self.tracks = survivors
+
+        for h in range(len(hands)):
+            if h not in matched_hands:
+                track = HandTrack(self.next_track_id, centroids[h])
+                self.next_track_id += 1
+                track.box = tuple(boxes[h].tolist())
+                track.raised = bool(raised[h])
+                self.tracks.append(track)
+
+        confirmed = []
+        for track in self.tracks:
+            if track.missed:
+                continue
+            if track.raised:
+                track.raised_frames = min(self.required_frames, track.raised_frames + 1)
+            else:
+                track.raised_frames = max(0, track.raised_frames - 1)
+
+            if track.raised_frames == 0:
+                track.confirmed = False
+            elif track.raised_frames >= self.required_frames and not track.confirmed:
+                track.confirmed = True
+                confirmed.append(track)
+
+        self.confirmations += len(confirmed)
+        return confirmed
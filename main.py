@@ -1,27 +1,144 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
-from face_recognition_module import FaceRecognitionModule
-from gesture_detection import GestureDetection
-from student_registration import StudentRegistration
-from dashboard import AttendanceDashboard
+import time
 import sys
 import os
 
+# face_recognition (dlib), mediapipe, OpenCV and pandas are imported when a
+# module is first built, so the menu does not wait for them
+
 class SmartAttendanceSystem:
     def __init__(self, root):
         self.root = root
         self.root.title("Smart Attendance System 👩‍💻")
-        self.root.geometry("800x600")
+        self.root.geometry("800x700")
         self.root.configure(bg='#2c3e50')
         
-        # Initialize modules
-        self.face_module = FaceRecognitionModule()
-        self.gesture_module = GestureDetection()
-        self.student_reg = StudentRegistration()
+        # Modules are built on first use, or by warm_up() while the menu is shown.
+        # Each has its own lock, so building one never waits for another
+        self.modules = {}
+        self.module_locks = {name: threading.Lock()
+                             for name in ('face_module', 'gesture_module', 'fused_mode', 'student_reg', 'dashboard')}
+        self.buttons = []
         
         self.setup_ui()
     
+    def get_module(self, name):
+        """Build the named module on first use; safe to call from any thread
+        
+        Blocks while another thread is building the same module, so the Tk
+        thread should go through when_ready() instead.
+        """
+        module = self.modules.get(name)
+        if module is not None:
+            return module
+        with self.module_locks[name]:
+            if name not in self.modules:
+                self.modules[name] = getattr(self, f"create_{name}")()
+            return self.modules[name]
+    
+    def when_ready(self, names, callback):
+        """Run callback on the Tk thread once the named modules are built
+        
+        Returns True if they already are and callback can go ahead right away.
+        Otherwise the mode buttons are disabled and the modules are built (or
+        waited for, if warm-up is building them) in a background thread, which
+        calls callback afterwards; returns False.
+        """
+        if all(name in self.modules for name in names):
+            return True
+        
+        self.update_status("Loading…")
+        self.set_buttons_state('disabled')
+        
+        def build():
+            try:
+                for name in names:
+                    self.get_module(name)
+            except Exception as e:
+                self.root.after(0, lambda error=e: self.loading_failed(error))
+                return
+            self.root.after(0, lambda: (self.set_buttons_state('normal'), callback()))
+        
+        threading.Thread(target=build, daemon=True).start()
+        return False
+    
+    def loading_failed(self, error):
+        self.set_buttons_state('normal')
+        messagebox.showerror("Error", f"Loading failed: {error}")
+        self.update_status("Ready")
+    
+    def set_buttons_state(self, state):
+        for button in self.buttons:
+            button.configure(state=state)
+    
+    def create_face_module(self):
+        from face_recognition_module import FaceRecognitionModule
+        return FaceRecognitionModule()
+    
+    def create_gesture_module(self):
+        from gesture_detection import GestureDetection
+        return GestureDetection()
+    
+    def create_fused_mode(self):
+        from fused_attendance import FusedAttendance
+        return FusedAttendance(self.gesture_module, self.face_module)
+    
+    def create_student_reg(self):
+        from student_registration import StudentRegistration
+        return StudentRegistration()
+    
+    def create_dashboard(self):
+        # Only the class: the dashboard imports the face stack, a window is opened per click
+        from dashboard import AttendanceDashboard
+        return AttendanceDashboard
+    
+    @property
+    def face_module(self):
+        return self.get_module('face_module')
+    
+    @property
+    def gesture_module(self):
+        return self.get_module('gesture_module')
+    
+    @property
+    def fused_mode(self):
+        return self.get_module('fused_mode')
+    
+    @property
+    def student_reg(self):
+        return self.get_module('student_reg')
+    
+    def start_warm_up(self):
+        """Load and initialize the models in a background thread"""
+        self.update_status("Loading models...")
+        thread = threading.Thread(target=self.warm_up, daemon=True)
+        thread.start()
+    
+    def warm_up(self):
+        """Build every module and run its models once, so no mode starts cold"""
+        started = time.perf_counter()
+        
+        def ready():
+            # Leave the status alone if a mode has been started meanwhile
+            if self.status_label.cget('text') == "Loading models...":
+                self.update_status("Ready")
+        
+        try:
+            self.gesture_module.warm_up()
+            self.face_module.warm_up()
+            self.get_module('fused_mode')
+            self.get_module('student_reg')
+            self.get_module('dashboard')
+        except Exception as e:
+            print(f"⚠ Model warm-up failed, modules will load on first use: {e}")
+            self.root.after(0, ready)
+            return
+        
+        print(f"Models ready after {time.perf_counter() - started:.1f} s")
+        self.root.after(0, ready)
+    
     def setup_ui(self):
         """Setup the main user interface"""
         # Main title
@@ -59,17 +176,21 @@ class SmartAttendanceSystem:
                                "Mark attendance by raising hand", 
                                self.start_gesture_detection, '#e74c3c', 1)
         
+        self.create_mode_button(button_frame, "🙋 Gesture + Face Mode", 
+                               "Raise hand to be recognized, no ID needed", 
+                               self.start_fused_mode, '#1abc9c', 2)
+        
         self.create_mode_button(button_frame, "👥 Student Registration", 
                                "Register new students and manage data", 
-                               self.open_registration, '#27ae60', 2)
+                               self.open_registration, '#27ae60', 3)
         
         self.create_mode_button(button_frame, "📊 View Dashboard", 
                                "View attendance records and statistics", 
-                               self.open_dashboard, '#f39c12', 3)
+                               self.open_dashboard, '#f39c12', 4)
         
         self.create_mode_button(button_frame, "🧪 Test Gesture Detection", 
                                "Test hand gesture recognition", 
-                               self.test_gesture, '#9b59b6', 4)
+                               self.test_gesture, '#9b59b6', 5)
         
         # Status frame
         status_frame = tk.Frame(self.root, bg='#2c3e50', height=50)
@@ -89,6 +210,7 @@ class SmartAttendanceSystem:
                           bg=color, fg='white', relief='flat', bd=0, pady=15,
                           command=command, cursor='hand2')
         button.pack(fill='x')
+        self.buttons.append(button)
         
         desc_label = tk.Label(button_container, text=description, 
                              font=('Arial', 10), fg='#bdc3c7', bg='#34495e')
@@ -111,7 +233,8 @@ class SmartAttendanceSystem:
             '#e74c3c': '#ec7063',
             '#27ae60': '#58d68d',
             '#f39c12': '#f8c471',
-            '#9b59b6': '#bb8fce'
+            '#9b59b6': '#bb8fce',
+            '#1abc9c': '#48c9b0'
         }
         return color_map.get(color, color)
     
@@ -129,7 +252,7 @@ class SmartAttendanceSystem:
                 success, message = self.face_module.start_face_recognition_mode()
                 self.root.after(0, lambda: self.update_status(f"Face Recognition: {message}"))
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Face recognition failed: {e}"))
+                self.root.after(0, lambda error=e: messagebox.showerror("Error", f"Face recognition failed: {error}"))
                 self.root.after(0, lambda: self.update_status("Ready"))
         
         thread = threading.Thread(target=run_face_recognition, daemon=True)
@@ -137,19 +260,48 @@ class SmartAttendanceSystem:
     
     def start_gesture_detection(self):
         """Start gesture detection mode in a separate thread"""
+        if not self.when_ready(('gesture_module',), self.start_gesture_detection):
+            return
         self.update_status("Starting Gesture Detection Mode...")
         
+        # Student IDs for raised hands are typed here while the video keeps running
+        prompt = CheckInPrompt(self.root, self.gesture_module.checkins)
+        
         def run_gesture_detection():
             try:
-                success, message = self.gesture_module.start_gesture_detection_mode()
+                success, message = self.gesture_module.start_gesture_detection_mode(id_sources=('tk',))
                 self.root.after(0, lambda: self.update_status(f"Gesture Detection: {message}"))
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Gesture detection failed: {e}"))
+                self.root.after(0, lambda error=e: messagebox.showerror("Error", f"Gesture detection failed: {error}"))
                 self.root.after(0, lambda: self.update_status("Ready"))
+            finally:
+                self.root.after(0, prompt.close)
         
         thread = threading.Thread(target=run_gesture_detection, daemon=True)
         thread.start()
     
+    def start_fused_mode(self):
+        """Start gesture + face mode in a separate thread"""
+        if not self.when_ready(('gesture_module', 'face_module', 'fused_mode'), self.start_fused_mode):
+            return
+        self.update_status("Starting Gesture + Face Mode...")
+        
+        # Raised hands without a recognized face still fall back to typing an ID
+        prompt = CheckInPrompt(self.root, self.gesture_module.checkins)
+        
+        def run_fused_mode():
+            try:
+                success, message = self.fused_mode.run(id_sources=('tk',))
+                self.root.after(0, lambda: self.update_status(f"Gesture + Face: {message}"))
+            except Exception as e:
+                self.root.after(0, lambda error=e: messagebox.showerror("Error", f"Gesture + face mode failed: {error}"))
+                self.root.after(0, lambda: self.update_status("Ready"))
+            finally:
+                self.root.after(0, prompt.close)
+        
+        thread = threading.Thread(target=run_fused_mode, daemon=True)
+        thread.start()
+    
     def test_gesture(self):
         """Test gesture detection in a separate thread"""
         self.update_status("Starting Gesture Test...")
@@ -159,7 +311,7 @@ class SmartAttendanceSystem:
                 success, message = self.gesture_module.test_gesture_detection()
                 self.root.after(0, lambda: self.update_status(f"Gesture Test: {message}"))
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", f"Gesture test failed: {e}"))
+                self.root.after(0, lambda error=e: messagebox.showerror("Error", f"Gesture test failed: {error}"))
                 self.root.after(0, lambda: self.update_status("Ready"))
         
         thread = threading.Thread(target=run_gesture_test, daemon=True)
@@ -167,14 +319,71 @@ class SmartAttendanceSystem:
     
     def open_registration(self):
         """Open student registration window"""
+        if not self.when_ready(('student_reg',), self.open_registration):
+            return
         self.update_status("Opening Student Registration...")
         registration_window = StudentRegistrationGUI(self.root, self.student_reg)
     
     def open_dashboard(self):
         """Open attendance dashboard"""
+        if not self.when_ready(('dashboard',), self.open_dashboard):
+            return
         self.update_status("Opening Dashboard...")
         dashboard_window = tk.Toplevel(self.root)
-        dashboard_app = AttendanceDashboard(dashboard_window)
+        dashboard_app = self.get_module('dashboard')(dashboard_window)
+
+class CheckInPrompt:
+    """Student ID entry for raised hands, shown while check-ins are pending
+    
+    Runs on the Tk main thread and polls the gesture module's check-in queue,
+    so the gesture video loop never waits for typing.
+    """
+    
+    def __init__(self, parent, checkins, poll_ms=250):
+        self.checkins = checkins
+        self.poll_ms = poll_ms
+        self.window = tk.Toplevel(parent)
+        self.window.title("Raised Hand Check-In")
+        self.window.geometry("320x150")
+        self.window.protocol("WM_DELETE_WINDOW", self.window.withdraw)
+        self.window.withdraw()
+        
+        self.pending_label = tk.Label(self.window, font=('Arial', 11, 'bold'))
+        self.pending_label.pack(pady=(10, 5))
+        
+        self.id_entry = tk.Entry(self.window, font=('Arial', 12))
+        self.id_entry.pack(fill='x', padx=20)
+        self.id_entry.bind('<Return>', lambda e: self.submit())
+        
+        tk.Button(self.window, text="Check In", command=self.submit).pack(pady=5)
+        
+        self.result_label = tk.Label(self.window, font=('Arial', 9))
+        self.result_label.pack()
+        
+        self.poll_id = self.window.after(self.poll_ms, self.poll)
+    
+    def poll(self):
+        """Show the window while raised hands are waiting for an ID"""
+        pending = len(self.checkins.pending())
+        if pending:
+            self.pending_label.config(text=f"Raised hands waiting: {pending}")
+            if self.window.state() == 'withdrawn':
+                self.window.deiconify()
+                self.id_entry.focus_set()
+        elif self.window.state() != 'withdrawn':
+            self.window.withdraw()
+        
+        self.poll_id = self.window.after(self.poll_ms, self.poll)
+    
+    def submit(self):
+        success, message = self.checkins.submit_id(self.id_entry.get())
+        self.result_label.config(text=message, fg='#27ae60' if success else '#e74c3c')
+        if success:
+            self.id_entry.delete(0, tk.END)
+    
+    def close(self):
+        self.window.after_cancel(self.poll_id)
+        self.window.destroy()
 
 class StudentRegistrationGUI:
     def __init__(self, parent, student_reg):
@@ -365,6 +574,8 @@ class StudentRegistrationGUI:
         self.email_entry.delete(0, tk.END)
 
 def main():
+    started = time.perf_counter()
+    
     # Check if required directories exist
     if not os.path.exists("data"):
         os.makedirs("data")
@@ -374,11 +585,20 @@ def main():
     root = tk.Tk()
     app = SmartAttendanceSystem(root)
     
+    def menu_shown():
+        print(f"Menu shown after {(time.perf_counter() - started) * 1000:.0f} ms")
+        app.start_warm_up()
+    root.after_idle(menu_shown)
+    
     try:
         root.mainloop()
     except KeyboardInterrupt:
         print("\nApplication closed by user")
         sys.exit(0)
+    finally:
+        # Only a mode that ran has imported the camera service
+        if 'frame_capture' in sys.modules:
+            sys.modules['frame_capture'].camera_service.close_all()
 
 if __name__ == "__main__":
     main()
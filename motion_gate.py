@@ -0,0 +1,85 @@
+import cv2
+from face_geometry import area_fraction
+
+
+def merge_regions(regions):
+    """Merge overlapping (top, right, bottom, left) boxes until none overlap"""
+    regions = list(regions)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(regions)):
+            for j in range(i + 1, len(regions)):
+                a, b = regions[i], regions[j]
+                if a[0] < b[2] and b[0] < a[2] and a[3] < b[1] and b[3] < a[1]:
+                    regions[i] = (min(a[0], b[0]), max(a[1], b[1]), max(a[2], b[2]), min(a[3], b[3]))
+                    del regions[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return regions
+
+
+class MotionGate:
+    """Cheap background-subtraction gate in front of face recognition
+
+    Runs MOG2 on a small grayscale copy of each frame. update() reports
+    whether anything moved, whether motion has just started after a quiet
+    period, and the changed regions (padded, in full-frame coordinates) so
+    detection can be limited to them. Regions are None when so much of the
+    frame changed that cropping would not pay off.
+    """
+
+    def __init__(self, scale=0.25, min_area_ratio=0.001, padding=0.5, max_region_fraction=0.5,
+                 history=300, var_threshold=32):
+        self.scale = scale
+        self.min_area_ratio = min_area_ratio
+        self.padding = padding
+        self.max_region_fraction = max_region_fraction
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(history, var_threshold, detectShadows=False)
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self.moving = False
+
+        self.frames = 0
+        self.quiet_frames = 0
+
+    def update(self, gray_frame):
+        """Feed a grayscale frame; returns (motion, motion_started, regions)"""
+        height, width = gray_frame.shape[:2]
+        small = cv2.resize(gray_frame, (0, 0), fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+
+        mask = self.subtractor.apply(small)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+        mask = cv2.dilate(mask, self.kernel, iterations=2)
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        min_area = self.min_area_ratio * small.shape[0] * small.shape[1]
+
+        regions = []
+        for contour in contours:
+            if cv2.contourArea(contour) < min_area:
+                continue
+
+            # Pad generously: a moving head is often only part of a face
+            x, y, w, h = (v / self.scale for v in cv2.boundingRect(contour))
+            pad = self.padding * max(w, h)
+            regions.append((
+                int(max(0, y - pad)), int(min(width, x + w + pad)),
+                int(min(height, y + h + pad)), int(max(0, x - pad))
+            ))
+
+        motion = bool(regions)
+        motion_started = motion and not self.moving
+        self.moving = motion
+
+        self.frames += 1
+        if not motion:
+            self.quiet_frames += 1
+
+        regions = merge_regions(regions)
+        if area_fraction(regions, gray_frame.shape) > self.max_region_fraction:
+            regions = None
+
+        return motion, motion_started, regions
+
@@ -0,0 +1,213 @@
+import argparse
+import threading
+import time
+from collections import deque
+import cv2
+from camera_config import get_camera_config
+from face_recognition_module import FaceRecognitionModule
+from frame_capture import camera_service
+
+
+def parse_source(source):
+    """Device indices are given as integers, everything else is a URL or file path"""
+    return int(source) if str(source).isdigit() else source
+
+
+class CameraStream:
+    """Capture and per-camera statistics for one source"""
+
+    def __init__(self, source):
+        self.source = source
+        self.name = f"Camera {source}"
+        self.config = get_camera_config(source)
+        # Shared with any other mode or camera entry using the same device
+        self.capture = camera_service.acquire(parse_source(source))
+        self.busy = False
+        self.last_recognized_id = 0
+        self.last_recognized_at = 0
+        self.recognized_faces = []
+
+        self.started_at = None
+        self.recognitions = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=100)
+
+    def stats(self):
+        """FPS and recognition latency for this camera"""
+        elapsed = max(time.monotonic() - self.started_at, 1e-6) if self.started_at else 1e-6
+        latencies = sorted(self.latencies)
+        return {
+            'camera': self.name,
+            'capture_fps': self.capture.captured_frames / elapsed,
+            'recognition_fps': self.recognitions / elapsed,
+            'dropped': self.capture.dropped_frames,
+            'errors': self.errors,
+            'latency_p50': latencies[len(latencies) // 2] if latencies else None,
+            'latency_max': latencies[-1] if latencies else None,
+        }
+
+
+class MultiCameraRunner:
+    """Run face recognition attendance on several cameras from one process
+
+    All cameras share one FaceRecognitionModule, so the gallery and SQLite
+    state are loaded once; each camera applies its own zones from
+    data/cameras.json. Recognition workers serve cameras round-robin,
+    always picking the camera that has waited longest, and a student seen by
+    two cameras is only marked once per dedup_window.
+    """
+
+    def __init__(self, sources, face_module, workers=2, dedup_window=10.0, display=True, stats_interval=10.0):
+        self.cameras = [CameraStream(source) for source in sources]
+        self.face_module = face_module
+        self.workers = workers
+        self.dedup_window = dedup_window
+        self.display = display
+        self.stats_interval = stats_interval
+
+        self.lock = threading.Lock()
+        self.marked_at = {}
+        self.running = False
+
+    def next_camera(self):
+        """Pick the idle camera with a new frame whose last recognition is oldest"""
+        with self.lock:
+            ready = [camera for camera in self.cameras
+                     if not camera.busy and camera.capture.frame_id > camera.last_recognized_id]
+            if not ready:
+                return None
+            camera = min(ready, key=lambda c: c.last_recognized_at)
+            camera.busy = True
+            return camera
+
+    def recognition_worker(self):
+        while self.running:
+            camera = self.next_camera()
+            if camera is None:
+                time.sleep(0.005)
+                continue
+
+            try:
+                frame_id, frame, captured_at = camera.capture.read(camera.last_recognized_id, timeout=0)
+                if frame is None:
+                    continue
+                # A frame that fails is not retried
+                camera.last_recognized_id = frame_id
+
+                recognized_faces = self.face_module.recognize_faces(frame, camera=camera.config)
+                camera.recognized_faces = recognized_faces
+                camera.recognitions += 1
+                camera.latencies.append(time.monotonic() - captured_at)
+                camera.last_recognized_at = time.monotonic()
+
+                self.mark_attendance(camera, recognized_faces)
+            except Exception as e:
+                # Skip the frame; the worker and the other cameras keep going
+                camera.errors += 1
+                camera.last_recognized_at = time.monotonic()
+                print(f"⚠ [{camera.name}] Recognition failed: {e}")
+            finally:
+                camera.busy = False
+
+    def mark_attendance(self, camera, recognized_faces):
+        """Mark each student once, however many cameras see them"""
+        now = time.monotonic()
+        for face in recognized_faces:
+            student_id = face['student_id']
+            if not student_id or face['confidence'] <= 0.5:
+                continue
+
+            with self.lock:
+                if now - self.marked_at.get(student_id, -self.dedup_window) < self.dedup_window:
+                    continue
+                self.marked_at[student_id] = now
+
+            success, message = self.face_module.attendance_mgr.mark_attendance(
+                student_id, face['name'], "Face Recognition"
+            )
+            print(f"{'✓' if success else '⚠'} [{camera.name}] {message}")
+
+    def print_stats(self):
+        for stats in [camera.stats() for camera in self.cameras]:
+            latency = f"{stats['latency_p50']:.2f}s / {stats['latency_max']:.2f}s" \
+                if stats['latency_p50'] is not None else "-"
+            print(f"{stats['camera']}: capture {stats['capture_fps']:.1f} fps, "
+                  f"recognition {stats['recognition_fps']:.1f} fps, dropped {stats['dropped']}, "
+                  f"errors {stats['errors']}, "
+                  f"latency p50/max {latency}")
+        if self.face_module.quality_gate is not None:
+            print(self.face_module.quality_gate.summary())
+        if self.face_module.encoding_cache is not None:
+            print(self.face_module.encoding_cache.summary())
+
+    def run(self):
+        """Run until 'q' is pressed (or Ctrl+C when headless)"""
+        for camera in self.cameras:
+            if not camera.capture.is_opened():
+                for other in self.cameras:
+                    camera_service.release(other.capture)
+                return False, f"Could not access {camera.name}"
+
+        print(f"Multi-Camera Mode Started with {len(self.cameras)} cameras")
+        print("Press 'q' to quit" if self.display else "Press Ctrl+C to quit")
+
+        self.running = True
+        for camera in self.cameras:
+            camera.started_at = time.monotonic()
+
+        threads = [threading.Thread(target=self.recognition_worker, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        last_stats = time.monotonic()
+        last_shown = [0] * len(self.cameras)
+        try:
+            while any(camera.capture.running for camera in self.cameras):
+                if self.display:
+                    for index, camera in enumerate(self.cameras):
+                        frame_id, frame, _ = camera.capture.read(last_shown[index], timeout=0)
+                        if frame is None:
+                            continue
+                        last_shown[index] = frame_id
+                        frame = self.face_module.draw_face_boxes(frame, camera.recognized_faces)
+                        cv2.imshow(camera.name, frame)
+
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+                else:
+                    time.sleep(0.1)
+
+                if time.monotonic() - last_stats > self.stats_interval:
+                    self.print_stats()
+                    last_stats = time.monotonic()
+        except KeyboardInterrupt:
+            pass
+
+        self.running = False
+        for thread in threads:
+            thread.join(timeout=2.0)
+        for camera in self.cameras:
+            camera_service.release(camera.capture)
+        if self.display:
+            cv2.destroyAllWindows()
+
+        self.print_stats()
+        return True, "Multi-camera mode ended"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face recognition attendance on several cameras")
+    parser.add_argument('sources', nargs='+', help="Device indices, RTSP URLs or video files")
+    parser.add_argument('--workers', type=int, default=2, help="Recognition worker threads")
+    parser.add_argument('--course', default=None, help="Course whose roster is matched first (default: timetable)")
+    parser.add_argument('--headless', action='store_true', help="Do not open preview windows")
+    args = parser.parse_args()
+
+    runner = MultiCameraRunner(args.sources, FaceRecognitionModule(course_id=args.course), workers=args.workers,
+                               display=not args.headless)
+    success, message = runner.run()
+    print(message)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+import numpy as np
+
+# Histogram bucket upper bounds in seconds, Prometheus style
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class StageTimer:
+    """Context manager timing one stage; created by StageProfiler.stage()"""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageProfiler:
+    """Lightweight per-stage timing with rolling percentiles
+
+    Each stage keeps a rolling window of recent durations (for percentiles
+    and the on-frame overlay) plus cumulative Prometheus histogram buckets.
+    Recording costs two perf_counter calls and a few list updates, so it can
+    stay enabled in production.
+    """
+
+    def __init__(self, module, window=300, log_interval=30.0, metrics_path=None):
+        self.module = module
+        self.window = window
+        self.log_interval = log_interval
+        self.metrics_path = metrics_path or os.path.join("data", "metrics", f"{module}.prom")
+        self.overlay_enabled = False
+
+        self.lock = threading.Lock()
+        self.recent = {}
+        self.bucket_counts = {}
+        self.totals = {}
+        self.last_log = time.monotonic()
+        self.server = None
+
+    def stage(self, name):
+        """Time a block: `with profiler.stage('face_encodings'): ...`"""
+        return StageTimer(self, name)
+
+    def record(self, name, seconds):
+        """Record one duration for a stage"""
+        with self.lock:
+            if name not in self.recent:
+                self.recent[name] = deque(maxlen=self.window)
+                self.bucket_counts[name] = [0] * (len(BUCKETS) + 1)
+                self.totals[name] = [0, 0.0]
+            self.recent[name].append(seconds)
+            self.bucket_counts[name][bisect.bisect_left(BUCKETS, seconds)] += 1
+            self.totals[name][0] += 1
+            self.totals[name][1] += seconds
+
+    def summary(self):
+        """Rolling p50/p95/max in milliseconds per stage"""
+        with self.lock:
+            windows = {name: np.array(values) for name, values in self.recent.items() if values}
+
+        return {
+            name: {
+                'count': len(values),
+                'p50': float(np.percentile(values, 50) * 1000),
+                'p95': float(np.percentile(values, 95) * 1000),
+                'max': float(values.max() * 1000),
+            }
+            for name, values in windows.items()
+        }
+
+    def toggle_overlay(self):
+        self.overlay_enabled = not self.overlay_enabled
+
+    def draw_overlay(self, frame, origin=(10, 90)):
+        """Draw the per-stage timing table on the frame when the overlay is enabled"""
+        if not self.overlay_enabled:
+            return frame
+
+        x, y = origin
+        for name, stats in sorted(self.summary().items(), key=lambda item: -item[1]['p50']):
+            cv2.putText(frame, f"{name:<16} p50 {stats['p50']:7.1f}ms  p95 {stats['p95']:7.1f}ms",
+                        (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 255), 1)
+            y += 16
+        return frame
+
+    def maybe_log(self):
+        """Print a summary line and refresh the metrics file every log_interval seconds"""
+        now = time.monotonic()
+        if now - self.last_log < self.log_interval:
+            return
+        self.last_log = now
+
+        summary = self.summary()
+        if summary:
+            parts = [f"{name} {stats['p50']:.1f}/{stats['p95']:.1f}ms" for name, stats in summary.items()]
+            print(f"[perf:{self.module}] p50/p95 " + ", ".join(parts))
+        self.write_metrics()
+
+    def prometheus_text(self):
+        """Metrics in the Prometheus text exposition format"""
+        metric = "attendance_stage_duration_seconds"
+        lines = [f"# HELP {metric} Time spent in each vision pipeline stage.",
+                 f"# TYPE {metric} histogram"]
+
+        with self.lock:
+            for name in sorted(self.bucket_counts):
+                labels = f'module="{self.module}",stage="{name}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, self.bucket_counts[name]):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                count, total = self.totals[name]
+                lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'{metric}_sum{{{labels}}} {total:.6f}')
+                lines.append(f'{metric}_count{{{labels}}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self):
+        """Dump metrics to metrics_path (node_exporter textfile collector compatible)"""
+        os.makedirs(os.path.dirname(self.metrics_path), exist_ok=True)
+        temp_path = self.metrics_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, self.metrics_path)
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Serve the metrics on http://host:port/metrics from a background thread"""
+        profiler = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = profiler.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server
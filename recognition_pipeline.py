@@ -0,0 +1,223 @@
+import argparse
+import queue
+import threading
+import time
+import cv2
+from frame_capture import camera_service
+
+
+class RecognitionPipeline:
+    """Threaded capture -> recognize -> mark/render pipeline
+
+    - A capture thread keeps only the latest camera frame.
+    - A dispatcher feeds a bounded queue for a pool of recognition workers;
+      when all workers are busy the frame is dropped instead of queued.
+    - Workers discard frames older than max_frame_age, so the delay between a
+      face appearing and attendance being marked stays bounded.
+    - SQLite writes run on their own thread and never stall recognition.
+    - The render loop draws the newest available results and never waits on
+      recognition.
+    """
+
+    def __init__(self, face_module, source=0, workers=2, recognize_interval=0.1,
+                 max_frame_age=1.0, dedup_window=10.0):
+        self.face_module = face_module
+        self.source = source
+        self.workers = workers
+        self.recognize_interval = recognize_interval
+        self.max_frame_age = max_frame_age
+        self.dedup_window = dedup_window
+
+        self.recognition_queue = queue.Queue(maxsize=workers)
+        self.attendance_queue = queue.Queue(maxsize=32)
+        self.results_lock = threading.Lock()
+        self.latest_faces = []
+        self.latest_result_id = 0
+        self.running = False
+
+        # Metrics
+        self.skipped_frames = 0
+        self.stale_frames = 0
+        self.failed_frames = 0
+        self.attendance_dropped = 0
+        self.recognized_frames = 0
+        self.mark_latencies = []
+
+    def dispatch_loop(self, capture):
+        """Hand the newest frame to a free worker every recognize_interval seconds"""
+        last_frame_id = 0
+        next_dispatch = 0
+
+        while self.running:
+            frame_id, frame, captured_at = capture.read(last_frame_id)
+            if frame is None:
+                continue
+            last_frame_id = frame_id
+
+            if captured_at < next_dispatch:
+                continue
+
+            try:
+                self.recognition_queue.put_nowait((frame_id, frame, captured_at))
+                next_dispatch = captured_at + self.recognize_interval
+            except queue.Full:
+                self.skipped_frames += 1
+
+    def recognition_worker(self):
+        while True:
+            item = self.recognition_queue.get()
+            if item is None:
+                break
+
+            frame_id, frame, captured_at = item
+            if time.monotonic() - captured_at > self.max_frame_age:
+                self.stale_frames += 1
+                continue
+
+            # One bad frame must not take the worker out of the pool
+            try:
+                recognized_faces = self.face_module.recognize_faces(frame)
+            except Exception as e:
+                self.failed_frames += 1
+                print(f"⚠ Recognition failed on frame {frame_id}: {e}")
+                continue
+
+            with self.results_lock:
+                self.recognized_frames += 1
+                # Workers can finish out of order; keep only the newest result
+                if frame_id > self.latest_result_id:
+                    self.latest_result_id = frame_id
+                    self.latest_faces = recognized_faces
+
+            if any(face['student_id'] for face in recognized_faces):
+                try:
+                    self.attendance_queue.put_nowait((recognized_faces, captured_at))
+                except queue.Full:
+                    self.attendance_dropped += 1
+
+    def attendance_loop(self):
+        """Write attendance to CSV/SQLite off the recognition path"""
+        recently_marked = set()
+        window_started = time.monotonic()
+
+        while True:
+            item = self.attendance_queue.get()
+            if item is None:
+                break
+
+            recognized_faces, captured_at = item
+            if time.monotonic() - window_started > self.dedup_window:
+                recently_marked.clear()
+                window_started = time.monotonic()
+
+            before = len(recently_marked)
+            self.face_module.mark_recognized(recognized_faces, recently_marked)
+            if len(recently_marked) > before:
+                self.mark_latencies.append(time.monotonic() - captured_at)
+
+    def metrics(self, capture):
+        """Current pipeline counters"""
+        latencies = sorted(self.mark_latencies)
+        return {
+            'captured': capture.captured_frames,
+            'capture_dropped': capture.dropped_frames,
+            'recognition_skipped': self.skipped_frames,
+            'stale_dropped': self.stale_frames,
+            'failed': self.failed_frames,
+            'attendance_dropped': self.attendance_dropped,
+            'recognized': self.recognized_frames,
+            'max_mark_latency': latencies[-1] if latencies else None,
+        }
+
+    def run(self, window_name='Smart Attendance - Face Recognition'):
+        """Run the pipeline until 'q' is pressed"""
+        capture = camera_service.acquire(self.source)
+        if not capture.is_opened():
+            return False, "Could not access camera"
+
+        print("Pipelined Face Recognition Mode Started")
+        print("Press 'q' to quit, 'r' to refresh student data")
+
+        self.running = True
+        threads = [threading.Thread(target=self.dispatch_loop, args=(capture,), daemon=True),
+                   threading.Thread(target=self.attendance_loop, daemon=True)]
+        threads += [threading.Thread(target=self.recognition_worker, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        last_frame_id = 0
+        try:
+            while True:
+                frame_id, frame, _ = capture.read(last_frame_id)
+                if frame is None:
+                    if not capture.running:
+                        break
+                    continue
+                last_frame_id = frame_id
+
+                with self.results_lock:
+                    recognized_faces = self.latest_faces
+
+                # read() returns a private copy, so it can be drawn on directly
+                frame = self.face_module.draw_face_boxes(frame, recognized_faces)
+
+                metrics = self.metrics(capture)
+                cv2.putText(frame, "Face Recognition Mode - Press 'q' to quit",
+                           (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+                cv2.putText(frame, f"Dropped: capture {metrics['capture_dropped']}  "
+                                  f"busy {metrics['recognition_skipped']}  stale {metrics['stale_dropped']}",
+                           (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+
+                cv2.imshow(window_name, frame)
+
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('q'):
+                    break
+                elif key == ord('r'):
+                    print("Refreshing student data...")
+                    self.face_module.refresh_data()
+        finally:
+            # Workers and the attendance writer are blocked on their queues until told to stop
+            self.running = False
+            camera_service.release(capture)
+            for _ in range(self.workers):
+                self.recognition_queue.put(None)
+            self.attendance_queue.put(None)
+            for thread in threads:
+                thread.join(timeout=2.0)
+            cv2.destroyAllWindows()
+
+        metrics = self.metrics(capture)
+        print(f"Frames captured: {metrics['captured']}, recognized: {metrics['recognized']}, "
+              f"dropped (capture/busy/stale): {metrics['capture_dropped']}/"
+              f"{metrics['recognition_skipped']}/{metrics['stale_dropped']}, "
+              f"failed: {metrics['failed']}, attendance events dropped: {metrics['attendance_dropped']}")
+        if metrics['max_mark_latency'] is not None:
+            print(f"Max face-to-attendance latency: {metrics['max_mark_latency']:.2f}s")
+        if self.face_module.quality_gate is not None:
+            print(self.face_module.quality_gate.summary())
+        if self.face_module.encoding_cache is not None:
+            print(self.face_module.encoding_cache.summary())
+
+        return True, "Face recognition mode ended"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Face recognition attendance with capture, recognition, "
+                                                 "attendance writes and rendering on separate threads")
+    parser.add_argument('--source', default='0', help="Device index, stream URL or video file")
+    parser.add_argument('--workers', type=int, default=2, help="Recognition worker threads")
+    parser.add_argument('--course', default=None, help="Course whose roster is matched first (default: timetable)")
+    args = parser.parse_args()
+
+    # face_recognition_module imports this module, so it is imported here
+    from face_recognition_module import FaceRecognitionModule
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    face_module = FaceRecognitionModule(course_id=args.course)
+    success, message = face_module.start_pipelined_recognition_mode(workers=args.workers, source=source)
+    print(message)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,29 @@ import face_recognition
 import pickle
 import os
 import json
-from datetime import datetime
+import numpy as np
+from datetime import datetime, time
+from face_index import quantize_int8, dequantize_int8
+from frame_capture import camera_service, convert_color
+
+# Header of the encodings pickle; older files are a bare {student_id: encoding} dict
+ENCODINGS_FORMAT = 'face_encodings/2'
 
 class StudentRegistration:
-    def __init__(self):
+    def __init__(self, encoding_dtype=None):
         self.faces_dir = "data/faces"
         self.students_file = "data/students.json"
         self.encodings_file = "data/face_encodings.pkl"
+        self.courses_file = "data/courses.json"
+        # On-disk encoding format: 'float64', 'float32' or 'int8' (with per-vector scale).
+        # It is recorded in the file; None keeps the format the file already uses
+        # (float64 for a new store), a value converts the store on its next save.
+        self.encoding_dtype = encoding_dtype
+        # Stored encodings are only read when registration needs them (see get_stored_encodings)
+        self.stored_encodings = None
         self.ensure_directories()
         self.load_students()
-        self.load_encodings()
+        self.load_courses()
     
     def ensure_directories(self):
         """Create necessary directories"""
@@ -34,18 +47,85 @@ class StudentRegistration:
         with open(self.students_file, 'w') as f:
             json.dump(self.students, f, indent=2)
     
+    def read_encodings_file(self):
+        """Return (dtype, {student_id: stored encoding}) from the pickle, or (None, {})"""
+        if not os.path.exists(self.encodings_file):
+            return None, {}
+        with open(self.encodings_file, 'rb') as f:
+            stored = pickle.load(f)
+        
+        if stored.get('format') == ENCODINGS_FORMAT:
+            return stored['dtype'], stored['encodings']
+        
+        # Older files: plain arrays, or (codes, scale) tuples for int8
+        values = list(stored.values())
+        if not values:
+            return None, stored
+        if isinstance(values[0], tuple):
+            return 'int8', stored
+        return np.asarray(values[0]).dtype.name, stored
+    
     def load_encodings(self):
-        """Load face encodings from pickle file"""
-        if os.path.exists(self.encodings_file):
-            with open(self.encodings_file, 'rb') as f:
-                self.known_encodings = pickle.load(f)
-        else:
-            self.known_encodings = {}
+        """Load face encodings from pickle file, in their stored format"""
+        dtype, stored = self.read_encodings_file()
+        if self.encoding_dtype is None:
+            self.encoding_dtype = dtype or 'float64'
+        
+        if dtype is not None and dtype != self.encoding_dtype:
+            stored = {
+                student_id: self.encode_encoding(self.decode_encoding(value)) for student_id, value in stored.items()
+            }
+        self.stored_encodings = stored
+    
+    def get_stored_encodings(self):
+        """Encodings by student ID in the on-disk format, loaded on first use"""
+        if self.stored_encodings is None:
+            self.load_encodings()
+        return self.stored_encodings
     
     def save_encodings(self):
-        """Save face encodings to pickle file"""
+        """Save face encodings to pickle file together with their format"""
+        stored = {
+            'format': ENCODINGS_FORMAT,
+            'dtype': self.encoding_dtype,
+            'encodings': self.get_stored_encodings(),
+        }
         with open(self.encodings_file, 'wb') as f:
-            pickle.dump(self.known_encodings, f)
+            pickle.dump(stored, f)
+    
+    def convert_encodings(self, encoding_dtype):
+        """Rewrite the encoding store in another format, e.g. 'int8' for large galleries"""
+        decoded = self.get_known_encodings()
+        self.encoding_dtype = encoding_dtype
+        self.stored_encodings = {student_id: self.encode_encoding(value) for student_id, value in decoded.items()}
+        self.save_encodings()
+    
+    def load_courses(self):
+        """Load course rosters and timetable from JSON file"""
+        if os.path.exists(self.courses_file):
+            with open(self.courses_file, 'r') as f:
+                self.courses = json.load(f)
+        else:
+            self.courses = {}
+    
+    def save_courses(self):
+        """Save course rosters and timetable to JSON file"""
+        with open(self.courses_file, 'w') as f:
+            json.dump(self.courses, f, indent=2)
+    
+    def encode_encoding(self, encoding):
+        """Convert an encoding to the configured on-disk format"""
+        if self.encoding_dtype == 'int8':
+            codes, scales = quantize_int8(np.asarray(encoding).reshape(1, -1))
+            return (codes[0], float(scales[0]))
+        return np.asarray(encoding, dtype=self.encoding_dtype)
+    
+    def decode_encoding(self, value):
+        """Read an encoding stored in any supported format"""
+        if isinstance(value, tuple):
+            codes, scale = value
+            return dequantize_int8(codes.reshape(1, -1), [scale])[0]
+        return value
     
     def register_student_manual(self, student_id, name, email=""):
         """Register student manually without face capture"""
@@ -63,8 +143,8 @@ class StudentRegistration:
         if student_id not in self.students:
             return False, "Student not found. Please register student first."
         
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
+        capture = camera_service.acquire(0)
+        if not capture.is_opened():
             return False, "Could not access camera"
         
         print(f"Capturing face for {self.students[student_id]['name']}")
@@ -72,17 +152,19 @@ class StudentRegistration:
         
         face_captured = False
         encoding = None
+        frame_id, frame, rgb_frame = 0, None, None
         
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            # Flip frame horizontally for mirror effect
-            frame = cv2.flip(frame, 1)
+            # The service delivers frames already mirrored, copied into the previous frame's buffer
+            frame_id, new_frame, _ = capture.read(frame_id, out=frame)
+            if new_frame is None:
+                if not capture.running:
+                    break
+                continue
+            frame = new_frame
             
             # Convert BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            rgb_frame = convert_color(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
             
             # Find faces in the frame
             face_locations = face_recognition.face_locations(rgb_frame)
@@ -120,12 +202,13 @@ class StudentRegistration:
                 else:
                     print("No face detected. Please position your face in the frame.")
         
-        cap.release()
+        camera_service.release(capture)
         cv2.destroyAllWindows()
         
         if face_captured:
-            # Store encoding
-            self.known_encodings[student_id] = encoding
+            # Store encoding in the store's format
+            stored = self.get_stored_encodings()
+            stored[student_id] = self.encode_encoding(encoding)
             self.save_encodings()
             
             # Update student record
@@ -165,10 +248,17 @@ class StudentRegistration:
         self.save_students()
         
         # Remove face encoding
-        if student_id in self.known_encodings:
-            del self.known_encodings[student_id]
+        stored = self.get_stored_encodings()
+        if student_id in stored:
+            del stored[student_id]
             self.save_encodings()
         
+        # Remove from course rosters
+        for course in self.courses.values():
+            if student_id in course['students']:
+                course['students'].remove(student_id)
+        self.save_courses()
+        
         # Remove face image
         face_image_path = os.path.join(self.faces_dir, f"{student_id}.jpg")
         if os.path.exists(face_image_path):
@@ -176,6 +266,96 @@ class StudentRegistration:
         
         return True, f"Student {student_name} deleted successfully"
     
+    def add_course(self, course_id, name):
+        """Create a course with an empty roster and timetable"""
+        if course_id in self.courses:
+            return False, "Course already exists"
+        
+        self.courses[course_id] = {'name': name, 'students': [], 'sessions': []}
+        self.save_courses()
+        return True, f"Course {name} added successfully"
+    
+    def enroll_student(self, course_id, student_id):
+        """Add a registered student to a course roster"""
+        if course_id not in self.courses:
+            return False, "Course not found"
+        if student_id not in self.students:
+            return False, "Student not found"
+        
+        roster = self.courses[course_id]['students']
+        if student_id not in roster:
+            roster.append(student_id)
+            self.save_courses()
+        return True, f"{self.students[student_id]['name']} enrolled in {self.courses[course_id]['name']}"
+    
+    def unenroll_student(self, course_id, student_id):
+        """Remove a student from a course roster"""
+        if course_id not in self.courses or student_id not in self.courses[course_id]['students']:
+            return False, "Student not enrolled in course"
+        
+        self.courses[course_id]['students'].remove(student_id)
+        self.save_courses()
+        return True, "Student removed from course"
+    
+    def add_session(self, course_id, day, start, end):
+        """Add a weekly timetable slot, e.g. ("Mon", "09:00", "10:30")"""
+        if course_id not in self.courses:
+            return False, "Course not found"
+        
+        try:
+            if time.fromisoformat(start) >= time.fromisoformat(end):
+                return False, "Session must end after it starts"
+        except ValueError:
+            return False, "Times must be in HH:MM format"
+        
+        day = day[:3].capitalize()
+        if day not in ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"):
+            return False, "Unknown day"
+        
+        self.courses[course_id]['sessions'].append({'day': day, 'start': start, 'end': end})
+        self.save_courses()
+        return True, f"Session added on {day} {start}-{end}"
+    
+    def get_roster(self, course_id):
+        """Student IDs enrolled in a course"""
+        course = self.courses.get(course_id)
+        return list(course['students']) if course else []
+    
+    def get_active_course(self, when=None):
+        """Course in session at the given datetime (default now), or None"""
+        when = when or datetime.now()
+        day = when.strftime("%a")
+        now = when.time()
+        
+        for course_id, course in self.courses.items():
+            for session in course['sessions']:
+                if session['day'] == day and \
+                        time.fromisoformat(session['start']) <= now < time.fromisoformat(session['end']):
+                    return course_id
+        return None
+    
     def get_known_encodings(self):
-        """Get all known face encodings for recognition"""
-        return self.known_encodings
+        """Get all known face encodings, decoded to float arrays"""
+        return {student_id: self.decode_encoding(value) for student_id, value in self.get_stored_encodings().items()}
+    
+    def read_gallery(self):
+        """Enrolled encodings straight from disk as compact arrays for matching
+        
+        Returns (student_ids, vectors): vectors is a float32 (n, 128) matrix,
+        or an (int8 codes, float32 scales) pair when the store is int8. Nothing
+        is kept on this instance, so the caller holds the only copy.
+        """
+        dtype, stored = self.read_encodings_file()
+        student_ids = list(stored)
+        
+        if dtype == 'int8':
+            codes = np.empty((len(student_ids), 128), dtype=np.int8)
+            scales = np.empty(len(student_ids), dtype=np.float32)
+            for row, student_id in enumerate(student_ids):
+                codes[row], scales[row] = stored[student_id]
+            return student_ids, (codes, scales)
+        
+        matrix = np.empty((len(student_ids), 128), dtype=np.float32)
+        for row, student_id in enumerate(student_ids):
+            matrix[row] = stored[student_id]
+        return student_ids, matrix